@@ -1,5 +1,5 @@
-from .agents import Agent, MarketMaker, ValueInvestor, NoiseTrader, MomentumTrader
+from .agents import Agent, MarketMaker, MarketMakerBatch, ValueInvestor, NoiseTrader, MomentumTrader, MomentumTraderBatch
 
 
 
-__all__ = ["Agent", "MarketMaker", "ValueInvestor", "NoiseTrader", "MomentumTrader"]
+__all__ = ["Agent", "MarketMaker", "MarketMakerBatch", "ValueInvestor", "NoiseTrader", "MomentumTrader", "MomentumTraderBatch"]
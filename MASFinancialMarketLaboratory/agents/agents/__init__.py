@@ -1,7 +1,9 @@
 from .agent import Agent
 from .market_maker import MarketMaker
+from .market_maker_batch import MarketMakerBatch
 from .noise_trader import NoiseTrader
 from .value_investor import ValueInvestor
 from .momentum_trader import MomentumTrader
+from .momentum_trader_batch import MomentumTraderBatch
 
-__all__ = ["Agent", "MarketMaker", "NoiseTrader", "ValueInvestor", "MomentumTrader"]
+__all__ = ["Agent", "MarketMaker", "MarketMakerBatch", "NoiseTrader", "ValueInvestor", "MomentumTrader", "MomentumTraderBatch"]
@@ -0,0 +1,31 @@
+from __future__ import annotations
+from typing import Any, Callable
+
+#Numba is optional, without it kernels run as plain Python functions.
+try:
+    from numba import njit, prange, guvectorize
+    NUMBA_AVAILABLE = True
+
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args: Any, **kwargs: Any) -> Any:
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+            return func
+
+        return decorator
+
+    def guvectorize(*args: Any, **kwargs: Any) -> Any:
+        #No broadcasting without numba, callers check NUMBA_AVAILABLE first
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+            return func
+
+        return decorator
+
+
+
+__all__ = ["njit", "prange", "guvectorize", "NUMBA_AVAILABLE"]
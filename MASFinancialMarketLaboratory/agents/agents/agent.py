@@ -1,6 +1,6 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Sequence, Tuple
 
 from agents.intents import AgentIntent
 from agents.models.agent_constants import AgentConstants
@@ -10,10 +10,18 @@ from environment.views.account_view import AccountView
 
 
 
+#Shared result of decides that emit nothing, immutable so no caller can grow it
+_NO_INTENTS: Tuple[AgentIntent, ...] = ()
+
+
 class Agent(ABC):
+    #Subclasses without __slots__ (e.g. MarketMaker) still get a __dict__
+    __slots__ = ("agent_id", "account_view", "constants", "_fee_multiplier")
+    
     agent_id:int
     account_view:AccountView
     constants:AgentConstants
+    _fee_multiplier:float #1 + fee_rate, cash paid per unit of traded value
     
 
     def __init__(self, agent_id:int, account_view:AccountView, constants:AgentConstants) -> None:
@@ -22,10 +30,11 @@ class Agent(ABC):
         self.agent_id = agent_id
         self.account_view = account_view
         self.constants = constants
+        self._fee_multiplier = 1 + constants.fee_rate
         
         
     @abstractmethod
-    def decide(self, view:AgentView) -> List[AgentIntent]:
+    def decide(self, view:AgentView) -> Sequence[AgentIntent]:
         pass
 
 
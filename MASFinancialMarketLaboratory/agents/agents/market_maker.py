@@ -1,15 +1,165 @@
 from __future__ import annotations
-from typing import List, Dict, Optional, Tuple
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import math
 
 from .agent import Agent
+from . import market_maker_kernels as kernels
 from agents.models import AgentView, AgentConstants, AgentFeedback
 from agents.intents import AgentIntent, PlaceOrderIntent, CancelOrderIntent
 
-from environment.views import AccountView, OrderView
+from environment.views import AccountView, OrderView, MarketDataView, EconomyInsightView
 from environment.models.order import OrderType, Side, OrderLifecycle, OrderEndReasons
 
 
 
+class QuoteSide:
+    #Orders of one book side as flat parallel lists, in submission order.
+    #A market maker holds only a few orders per side, so cancel selection
+    #walks the lists directly. Side and price never change and are resolved
+    #once at ingest. Lifecycle is read live from the views since fills by
+    #other agents arrive without feedback, and compared by identity.
+    #Positions are also indexed by PRICE_TOLERANCE-wide price buckets, so a
+    #coverage check only visits the three buckets a match can fall into.
+    
+    PRICE_TOLERANCE = 1.0
+    
+    order_ids: List[int]
+    order_views: List[OrderView]
+    order_prices: List[float] #NaN = no price, never equivalent
+    order_buckets: Dict[int, List[int]] #price bucket -> positions, priced orders only
+    
+    
+    def __init__(self) -> None:
+        self.order_ids = []
+        self.order_views = []
+        self.order_prices = []
+        self.order_buckets = {}
+    
+    
+    def __len__(self) -> int:
+        return len(self.order_ids)
+    
+    
+    def add(self, order_view: OrderView) -> None:
+        price = order_view.price
+        
+        if price is not None:
+            self.order_buckets.setdefault(self._bucket(price), []).append(len(self.order_ids))
+        
+        self.order_ids.append(order_view.order_id)
+        self.order_views.append(order_view)
+        self.order_prices.append(math.nan if price is None else price)
+    
+    
+    def has_working(self) -> bool:
+        #Empty side is O(1), otherwise stops at the first working order.
+        #Kept as a scan since lifecycles change without feedback.
+        
+        if not self.order_views:
+            return False
+        
+        working = OrderLifecycle.WORKING
+        for order_view in self.order_views:
+            if order_view.lifecycle is working:
+                return True
+        return False
+    
+    
+    def collect_working_ids(self, order_ids: List[int]) -> None:
+        working = OrderLifecycle.WORKING
+        for order_id, order_view in zip(self.order_ids, self.order_views):
+            if order_view.lifecycle is working:
+                order_ids.append(order_id)
+    
+    
+    def has_equivalent(self, target_price: float) -> bool:
+        working = OrderLifecycle.WORKING
+        tolerance = self.PRICE_TOLERANCE
+        bucket = self._bucket(target_price)
+        
+        for neighbour in (bucket - 1, bucket, bucket + 1):
+            for position in self.order_buckets.get(neighbour, ()):
+                if self.order_views[position].lifecycle is working and abs(self.order_prices[position] - target_price) <= tolerance:
+                    return True
+        return False
+    
+    
+    def scan(self, target_price: float, stale_ids: List[int]) -> bool:
+        #Single pass over working orders against a target quote, returns whether
+        #one is equivalent and appends the non-equivalent ids to stale_ids.
+        
+        working = OrderLifecycle.WORKING
+        tolerance = self.PRICE_TOLERANCE
+        
+        has_equivalent = False
+        
+        for order_id, order_view, price in zip(self.order_ids, self.order_views, self.order_prices):
+            if order_view.lifecycle is not working:
+                continue
+            
+            if abs(price - target_price) <= tolerance:
+                has_equivalent = True
+            else:
+                stale_ids.append(order_id)
+        
+        return has_equivalent
+    
+    
+    def remove_done(self) -> bool:
+        #Compacts out DONE orders, returns True if any of them was filled
+        
+        done = OrderLifecycle.DONE
+        filled = False
+        order_ids = []
+        order_views = []
+        order_prices = []
+        order_buckets: Dict[int, List[int]] = {}
+        
+        for order_id, order_view, price in zip(self.order_ids, self.order_views, self.order_prices):
+            if order_view.lifecycle is done:
+                if order_view.end_reason is OrderEndReasons.FILLED:
+                    filled = True
+                continue
+            
+            if price == price: #NaN = unpriced, left out of the index
+                order_buckets.setdefault(self._bucket(price), []).append(len(order_ids))
+            
+            order_ids.append(order_id)
+            order_views.append(order_view)
+            order_prices.append(price)
+        
+        self.order_ids = order_ids
+        self.order_views = order_views
+        self.order_prices = order_prices
+        self.order_buckets = order_buckets
+        
+        return filled
+    
+    
+    def _bucket(self, price: float) -> int:
+        return math.floor(price / self.PRICE_TOLERANCE)
+    
+    
+
+@dataclass(frozen=True)
+class TickPlan:
+    #Everything one decide emits, resolved before any intent is built.
+    #Cancels go first, then bid, then ask. Zero quantity = no order on that side.
+    
+    layer: str
+    cancel_ids: List[int]
+    
+    bid_price: float = 0.0
+    bid_quantity: int = 0
+    ask_price: float = 0.0
+    ask_quantity: int = 0
+    
+    mid_price: Optional[float] = None #Recorded as last_mid_price
+    quoted: bool = False #Refreshes last_quote_global_tick
+    
+    
+
 class MarketMaker(Agent):
     #SURVIVE > STABILIZE > PROVIDE
     
@@ -27,13 +177,21 @@ class MarketMaker(Agent):
     order_size: int
     wait_time: int
     
-    active_bids: Dict[int, OrderView]
-    active_asks: Dict[int, OrderView]
+    active_bids: QuoteSide
+    active_asks: QuoteSide
     last_known_price: Optional[float]
     last_quote_tick: Optional[int]
     current_micro_tick: int
     
-    __intent_id: int
+    #Derived pricing constants, parameters are fixed after construction
+    _half_spread: float
+    _panic_offset: float
+    
+    _intent_counter: int #Next unused intent id
+    
+    #(cash, shares, last_known_price) -> (inventory_ratio, layer) of the last decide
+    _layer_state: Optional[Tuple[float, int, Optional[float]]]
+    _layer_memo: Tuple[float, str]
     
     
     def __init__(
@@ -61,8 +219,11 @@ class MarketMaker(Agent):
         self.wait_time = wait_time
         self.skew_factor = skew_factor
         
-        self.active_bids = {}
-        self.active_asks = {}
+        self._half_spread = spread_size / 2.0
+        self._panic_offset = 5.0 * spread_size
+        
+        self.active_bids = QuoteSide()
+        self.active_asks = QuoteSide()
         self.last_known_price = None
         self.last_quote_tick = None
         self.current_micro_tick = 0
@@ -76,61 +237,137 @@ class MarketMaker(Agent):
         self.current_global_tick: int = 0
         self.last_quote_global_tick: Optional[int] = None
         
-        self.__intent_id = 0
-    
-    
-    @property
-    def intent_id(self) -> int:
-        intent_id = self.__intent_id
-        self.__intent_id += 1
-        return intent_id
+        self._intent_counter = 0
+        
+        self._layer_state = None
+        self._layer_memo = (target_inventory_fraction, 'PROVIDE')
     
     
     def decide(self, view: AgentView) -> List[AgentIntent]:
+        #Views are validated here once and handed down already narrowed
+        market_data = view.market_data_view
+        economy_insight = view.economy_insight_view
         assert view.agent_id == self.agent_id
-        assert view.market_data_view is not None
-        assert view.economy_insight_view is not None
+        assert market_data is not None
+        assert economy_insight is not None
+        
+        intents: List[AgentIntent] = []
+        self._emit_plan(self._compute_tick_plan(view, market_data, economy_insight), intents)
+        
+        return intents
+    
+    
+    def _compute_tick_plan(self, view: AgentView, market_data: MarketDataView, economy_insight: EconomyInsightView) -> TickPlan:
+        inventory_ratio, current_layer = self._resolve_layer()
+        self._start_tick(view, current_layer, inventory_ratio)
+        
+        if current_layer == 'SURVIVE':
+            return self._plan_survive(market_data, economy_insight, inventory_ratio)
+        
+        mid_price = self._estimate_price(market_data, economy_insight)
+        if mid_price is None:
+            return TickPlan(current_layer, [])
+        
+        fee_rate = self.constants.fee_rate
+        
+        if current_layer == 'STABILIZE':
+            bid_price, ask_price = kernels.skewed_quotes(
+                mid_price,
+                inventory_ratio,
+                self.target_inventory_fraction,
+                self.skew_factor,
+                self._half_spread,
+                fee_rate
+            )
+            return self._plan_stabilize(inventory_ratio, mid_price, bid_price, ask_price)
+        
+        bid_price, ask_price = kernels.provide_quotes(mid_price, self._half_spread, fee_rate)
+        return self._plan_provide(mid_price, bid_price, ask_price)
+    
+    
+    def _start_tick(self, view: AgentView, current_layer: str, inventory_ratio: float) -> None:
+        #Per-tick bookkeeping shared by decide and MarketMakerBatch.decide_all
         
-
         self.current_micro_tick = view.micro_tick
         self.current_global_tick = view.macro_tick * self.constants.simulation_micro_tick + view.micro_tick
         
         self.layer_changed = False
-        current_layer = self._determine_current_layer()
-        
         if self._last_layer != current_layer:
             self.layer_changed = True
         self._last_layer = current_layer
         
-        
-        new_ratio = self._calculate_inventory_ratio()
         if self.last_inventory_ratio is not None:
             old_direction = self.last_inventory_ratio - self.target_inventory_fraction
-            new_direction = new_ratio - self.target_inventory_fraction
+            new_direction = inventory_ratio - self.target_inventory_fraction
         
             if old_direction * new_direction < 0:
                 self.layer_changed = True
                 
-        self.last_inventory_ratio = new_ratio
-        
+        self.last_inventory_ratio = inventory_ratio
+    
+    
+    def _resolve_layer(self) -> Tuple[float, str]:
+        #Ratio and layer only depend on inventory and the last known price,
+        #idle ticks (no fill, no price move) reuse the previous result
         
-        if current_layer == 'SURVIVE':
-            return self._survive_layer(view)
+        state = (self.account_view.cash, self.account_view.shares, self.last_known_price)
+        if state == self._layer_state:
+            return self._layer_memo
         
-        if current_layer == 'STABILIZE':
-            return self._stabilize_layer(view)
+        inventory_ratio = self._calculate_inventory_ratio()
+        self._layer_state = state
+        self._layer_memo = (inventory_ratio, self._determine_current_layer(inventory_ratio))
         
-        return self._provide_layer(view)
+        return self._layer_memo
     
     
-    def _determine_current_layer(self) -> str:
-        if self._should_survive():
+    def _determine_current_layer(self, inventory_ratio: float) -> str:
+        if inventory_ratio < self.risk_lower_bound or inventory_ratio > self.risk_upper_bound:
             return 'SURVIVE'
-        if self._should_stabilize():
+        if abs(inventory_ratio - self.target_inventory_fraction) > self.stabilization_tolerance:
             return 'STABILIZE'
         return 'PROVIDE'
     
     
+    def _emit_plan(self, plan: TickPlan, intents: List[AgentIntent]) -> None:
+        #Appends the plan's intents to the caller's list, ids are taken as one
+        #consecutive block in emission order
+        
+        intent_id = self._intent_counter
+        
+        for order_id in plan.cancel_ids:
+            intents.append(CancelOrderIntent(intent_id=intent_id, order_id=order_id))
+            intent_id += 1
+        
+        if plan.bid_quantity > 0:
+            intents.append(PlaceOrderIntent(
+                intent_id=intent_id,
+                side=Side.BUY,
+                order_type=OrderType.LIMIT,
+                quantity=plan.bid_quantity,
+                price=plan.bid_price
+            ))
+            intent_id += 1
+        
+        if plan.ask_quantity > 0:
+            intents.append(PlaceOrderIntent(
+                intent_id=intent_id,
+                side=Side.SELL,
+                order_type=OrderType.LIMIT,
+                quantity=plan.ask_quantity,
+                price=plan.ask_price
+            ))
+            intent_id += 1
+        
+        self._intent_counter = intent_id
+        
+        if plan.mid_price is not None:
+            self.last_mid_price = plan.mid_price
+        
+        if plan.quoted:
+            self.last_quote_global_tick = self.current_global_tick
+    
+    
     def update(self, feedback: AgentFeedback) -> None:
         self.order_filled_this_tick = False
         
@@ -139,431 +376,143 @@ class MarketMaker(Agent):
                 continue
             
             if order_view.side == Side.BUY:
-                self.active_bids[order_view.order_id] = order_view
+                self.active_bids.add(order_view)
             else:
-                self.active_asks[order_view.order_id] = order_view
+                self.active_asks.add(order_view)
         
         self._cleanup_done_orders()
     
     
-    def _should_survive(self) -> bool:
-        inventory_ratio = self._calculate_inventory_ratio()
-        
-        if inventory_ratio < self.risk_lower_bound:
-            return True  # Too many shares
-        if inventory_ratio > self.risk_upper_bound:
-            return True  # Too much cash
-        
-        return False
-    
-    
-    def _survive_layer(self, view: AgentView) -> List[AgentIntent]:
-        intents = []
-        
-        intents.extend(self._cancel_all_orders())
+    def _plan_survive(self, market_data: MarketDataView, economy_insight: EconomyInsightView, inventory_ratio: float) -> TickPlan:
+        # Too many shares - PANIC SELL, too much cash - PANIC BUY
+        panic_sell = inventory_ratio < self.risk_lower_bound
         
-        inventory_ratio = self._calculate_inventory_ratio()
-        
-        if inventory_ratio < self.risk_lower_bound:
-            # Too many shares - PANIC SELL
-            intent = self._create_panic_sell_intent(view)
-            if intent:
-                intents.append(intent)
-        
-        elif inventory_ratio > self.risk_upper_bound:
-            # Too much cash - PANIC BUY
-            intent = self._create_panic_buy_intent(view)
-            if intent:
-                intents.append(intent)
-        
-        return intents
-    
-    
-    def _create_panic_sell_intent(self, view: AgentView) -> Optional[PlaceOrderIntent]:
         shares = self.account_view.shares
-        if shares <= 0:
-            return None
+        cash = self.account_view.cash
+        if (shares <= 0) if panic_sell else (cash <= 0):
+            return self._plan_panic(panic_sell, None, 0.0, 0)
         
-        mid_price = self._estimate_price(view)
+        mid_price = self._estimate_price(market_data, economy_insight)
         if mid_price is None:
-            return None
+            return self._plan_panic(panic_sell, None, 0.0, 0)
         
-        panic_sell_price = mid_price - (5 * self.spread_size)
-        panic_sell_price = max(0.01, panic_sell_price)
-        quantity = min(shares, self.order_size * 3)# Larger size in panic
-        
-        self.last_mid_price = mid_price
+        # Larger size in panic
+        if panic_sell:
+            price, quantity = kernels.panic_sell_order(mid_price, self._panic_offset, shares, self.order_size * 3)
+        else:
+            price, quantity = kernels.panic_buy_order(mid_price, self._panic_offset, cash, self._fee_multiplier, self.order_size * 3)
         
-        return PlaceOrderIntent(
-            intent_id=self.intent_id,
-            side=Side.SELL,
-            order_type=OrderType.LIMIT,
-            quantity=quantity,
-            price=panic_sell_price
-        )
+        return self._plan_panic(panic_sell, mid_price, price, quantity)
     
     
-    def _create_panic_buy_intent(self, view: AgentView) -> Optional[PlaceOrderIntent]:
-        cash = self.account_view.cash
-        if cash <= 0:
-            return None
-        
-        mid_price = self._estimate_price(view)
-        if mid_price is None:
-            return None
-        
-        panic_buy_price = mid_price + (5 * self.spread_size)
-        
-        # Calculate affordable quantity
-        cost_per_share = panic_buy_price * (1 + self.constants.fee_rate)
-        max_quantity = int(cash / cost_per_share)
-        quantity = min(max_quantity, self.order_size * 3)
+    def _plan_panic(self, panic_sell: bool, mid_price: Optional[float], price: float, quantity: int) -> TickPlan:
+        cancel_ids: List[int] = []
+        self.active_bids.collect_working_ids(cancel_ids)
+        self.active_asks.collect_working_ids(cancel_ids)
         
         if quantity <= 0:
-            return None
+            return TickPlan('SURVIVE', cancel_ids)
         
-        self.last_mid_price = mid_price
-        
-        return PlaceOrderIntent(
-            intent_id=self.intent_id,
-            side=Side.BUY,
-            order_type=OrderType.LIMIT,
-            quantity=quantity,
-            price=panic_buy_price
-        )
-    
-        
-    def _should_stabilize(self) -> bool:
-        inventory_ratio = self._calculate_inventory_ratio()
-        deviation = abs(inventory_ratio - self.target_inventory_fraction)
-        
-        return deviation > self.stabilization_tolerance
+        if panic_sell:
+            return TickPlan('SURVIVE', cancel_ids, ask_price=price, ask_quantity=quantity, mid_price=mid_price)
+        return TickPlan('SURVIVE', cancel_ids, bid_price=price, bid_quantity=quantity, mid_price=mid_price)
     
     
-    def _stabilize_layer(self, view: AgentView) -> List[AgentIntent]:
-        intents = []
-        
-        inventory_ratio = self._calculate_inventory_ratio()
-        skew = self._calculate_skew(inventory_ratio)
-        
-        mid_price = self._estimate_price(view)
-        if mid_price is None:
-            return intents
+    def _plan_stabilize(self, inventory_ratio: float, mid_price: float, bid_price: float, ask_price: float) -> TickPlan:
+        #If inventory_ratio < target (too many shares):
+        #    - We need to SELL → asks are supportive → NEVER cancel asks
+        #    - Cancel non-equivalent BIDS only
         
+        #If inventory_ratio > target (too much cash):
+        #    - We need to BUY → bids are supportive → NEVER cancel bids
+        #    - Cancel non-equivalent ASKS only
         
-        bid_price, ask_price = self._calculate_skewed_prices(mid_price, skew)
         bid_quantity, ask_quantity = self._calculate_skewed_quantities(inventory_ratio)
         
-        if bid_price >= ask_price:
-            # Ensure bid < ask
-            spread = max(1.0, self.spread_size / 2.0)
-            bid_price = mid_price - spread
-            ask_price = mid_price + spread
-        
-        
-        intents.extend(self._selective_stabilize_cancel(inventory_ratio, bid_price, ask_price))
-        
-        # Check existing coverage after selective cancel
-        has_equivalent_bid = self._has_equivalent_working_order(Side.BUY, bid_price)
-        has_equivalent_ask = self._has_equivalent_working_order(Side.SELL, ask_price)
-        
-        if not has_equivalent_bid and bid_quantity > 0 and bid_price > 0:
-            intents.append(PlaceOrderIntent(
-                intent_id=self.intent_id,
-                side=Side.BUY,
-                order_type=OrderType.LIMIT,
-                quantity=bid_quantity,
-                price=bid_price
-            ))
-        
-        if not has_equivalent_ask and ask_quantity > 0 and ask_price > 0:
-            intents.append(PlaceOrderIntent(
-                intent_id=self.intent_id,
-                side=Side.SELL,
-                order_type=OrderType.LIMIT,
-                quantity=ask_quantity,
-                price=ask_price
-            ))
-        
-        self.last_mid_price = mid_price
-        
-        return intents
-    
-    
-    def _calculate_skew(self, inventory_ratio: float) -> float:
-        #Calculate price skew based on inventory imbalance.
-        #Positive skew = need to buy (shift quotes up)
-        #Negative skew = need to sell (shift quotes down)
-
-        deviation = inventory_ratio - self.target_inventory_fraction
-        skew = -deviation * self.skew_factor
-        return skew
-    
-    
-    def _calculate_skewed_prices(self, mid_price: float, skew: float) -> Tuple[float, float]:
-        max_shift = self.spread_size / 2.0  # ±1 tick absolute
-
-        skew_direction = 1 if skew > 0 else -1 if skew < 0 else 0
-        price_shift = skew_direction * min(abs(skew / 100.0 * mid_price), max_shift)
-        
-        # Apply limited shift to mid point
-        shifted_mid = mid_price + price_shift
-        
-        # Calculate base spread
-        half_spread = self.spread_size / 2.0
-        
-        bid_price = shifted_mid - half_spread
-        ask_price = shifted_mid + half_spread
-        
-        fee_per_share = mid_price * self.constants.fee_rate
-        bid_price = bid_price - fee_per_share
-        ask_price = ask_price + fee_per_share
-        
-        return max(0.01, bid_price), max(0.01, ask_price)
-    
-    
-    def _calculate_skewed_quantities(self, inventory_ratio: float) -> Tuple[int, int]:
-        base_quantity = self.order_size
-        
-        # Calculate deviation magnitude for proportional skew
-        deviation = abs(inventory_ratio - self.target_inventory_fraction)
-        
-        # Scale skew factor: larger deviation = more aggressive skew
-        # Base: 2x supportive, 0.5x risk-creating
-        supportive_multiplier = min(2.0 + deviation * 2, 3.0)  # Cap at 3x
-        risk_multiplier = max(0.5 - deviation, 0.25)  # Floor at 0.25x
-        
-        if inventory_ratio > self.target_inventory_fraction:
-            # Too much cash - bigger bid (supportive), smaller ask (risk)
-            bid_quantity = int(base_quantity * supportive_multiplier)
-            ask_quantity = int(base_quantity * risk_multiplier)
+        cancel_ids: List[int] = []
+        if inventory_ratio < self.target_inventory_fraction:
+            has_equivalent_bid = self.active_bids.scan(bid_price, cancel_ids)
+            has_equivalent_ask = self.active_asks.has_equivalent(ask_price)
         else:
-            # Too many shares - smaller bid (risk), bigger ask (supportive)
-            bid_quantity = int(base_quantity * risk_multiplier)
-            ask_quantity = int(base_quantity * supportive_multiplier)
+            has_equivalent_bid = self.active_bids.has_equivalent(bid_price)
+            has_equivalent_ask = self.active_asks.scan(ask_price, cancel_ids)
         
-        bid_quantity = self._validate_bid_quantity(bid_quantity)
-        ask_quantity = self._validate_ask_quantity(ask_quantity)
+        # Cancels are only requested here, so coverage is decided on current orders
+        if has_equivalent_bid or bid_price <= 0:
+            bid_quantity = 0
+        if has_equivalent_ask or ask_price <= 0:
+            ask_quantity = 0
         
-        return bid_quantity, ask_quantity
+        return TickPlan('STABILIZE', cancel_ids, bid_price, bid_quantity, ask_price, ask_quantity, mid_price)
     
-        
-    def _provide_layer(self, view: AgentView) -> List[AgentIntent]:
-        intents = []
-        
-        mid_price = self._estimate_price(view)
-        if mid_price is None:
-            return intents
-        
-        bid_price, ask_price = self._calculate_provide_prices(mid_price)
-        
-        # Ensure wash trade prevention
-        if bid_price >= ask_price:
-            return intents
-        
-        #Check if we need to refresh
-        if not self._should_refresh_quotes(mid_price):
-            return []
-        
-        #Selective cancel
-        intents.extend(self._cancel_non_equivalent_orders(bid_price, ask_price))
-        
-        #Check existing coverage
-        has_equivalent_bid = self._has_equivalent_working_order(Side.BUY, bid_price)
-        has_equivalent_ask = self._has_equivalent_working_order(Side.SELL, ask_price)
-        
-        if not has_equivalent_bid:
-            bid_quantity = self._validate_bid_quantity(self.order_size)
-            if bid_quantity > 0:
-                intents.append(PlaceOrderIntent(
-                    intent_id=self.intent_id,
-                    side=Side.BUY,
-                    order_type=OrderType.LIMIT,
-                    quantity=bid_quantity,
-                    price=bid_price
-                ))
-        
-        if not has_equivalent_ask:
-            ask_quantity = self._validate_ask_quantity(self.order_size)
-            if ask_quantity > 0:
-                intents.append(PlaceOrderIntent(
-                    intent_id=self.intent_id,
-                    side=Side.SELL,
-                    order_type=OrderType.LIMIT,
-                    quantity=ask_quantity,
-                    price=ask_price
-                ))
-        
-        if intents:
-            self.last_quote_global_tick = self.current_global_tick
-            self.last_mid_price = mid_price
-        
-        return intents
     
+    def _calculate_skewed_quantities(self, inventory_ratio: float) -> Tuple[int, int]:
+        return kernels.stabilize_quantities(
+            inventory_ratio,
+            self.target_inventory_fraction,
+            self.order_size,
+            self.account_view.cash,
+            self.account_view.shares,
+            math.nan if self.last_known_price is None else self.last_known_price,
+            self.constants.fee_rate
+        )
     
-    def _calculate_provide_prices(self, mid_price: float) -> Tuple[float, float]:
-        half_spread = self.spread_size / 2.0
-        
-        bid_price = mid_price - half_spread
-        ask_price = mid_price + half_spread
-        
-        total_fee_per_share = 2 * self.constants.fee_rate * mid_price
-        
-        bid_price = bid_price - total_fee_per_share / 2.0
-        ask_price = ask_price + total_fee_per_share / 2.0
         
-        return max(0.01, bid_price), max(0.01, ask_price)
-    
-    
-    def _should_refresh_quotes(self, current_mid_price: Optional[float] = None) -> bool:
+    def _plan_provide(self, mid_price: float, bid_price: float, ask_price: float) -> TickPlan:
+        #Refresh on:
         #- Order DONE (filled/cancelled)
         #- Mid-price drift > tolerance
         #- Layer transition / inventory direction change
         #- No working orders
-
+        
+        # Ensure wash trade prevention
+        if bid_price >= ask_price:
+            return TickPlan('PROVIDE', [])
+        
         if self.last_quote_global_tick is not None:
             elapsed = self.current_global_tick - self.last_quote_global_tick
             if elapsed < self.wait_time:
-                return False
-        
-        if self.last_quote_global_tick is None:
-            return True
-        
-        if self.order_filled_this_tick:
-            return True
-        
-        if self.layer_changed:
-            return True
-        
-        if current_mid_price is not None and self.last_mid_price is not None:
-            drift = abs(current_mid_price - self.last_mid_price) / self.last_mid_price if self.last_mid_price > 0 else 0
-            drift_tolerance = self.spread_size / (2 * self.last_mid_price) if self.last_mid_price > 0 else 0.01
-            if drift > drift_tolerance:
-                return True
-        
-        has_working_bid = any(o.lifecycle == OrderLifecycle.WORKING for o in self.active_bids.values())
-        has_working_ask = any(o.lifecycle == OrderLifecycle.WORKING for o in self.active_asks.values())
-        
-        if not has_working_bid or not has_working_ask:
-            return True
-        
-        return False
-    
-    
-    def _cancel_all_orders(self) -> List[CancelOrderIntent]:
-        intents = []
-        
-        for order_id, order_view in list(self.active_bids.items()):
-            if order_view.lifecycle == OrderLifecycle.WORKING:
-                intents.append(CancelOrderIntent(
-                    intent_id=self.intent_id,
-                    order_id=order_id
-                ))
-        
-        for order_id, order_view in list(self.active_asks.items()):
-            if order_view.lifecycle == OrderLifecycle.WORKING:
-                intents.append(CancelOrderIntent(
-                    intent_id=self.intent_id,
-                    order_id=order_id
-                ))
-        
-        return intents
-        
-    def _is_quote_equivalent(self, order_view: OrderView, target_price: float, target_side: Side) -> bool:
-        if order_view.lifecycle != OrderLifecycle.WORKING:
-            return False
-        if order_view.side != target_side:
-            return False
-
-        price_tolerance = 1.0
-        if order_view.price is not None and abs(order_view.price - target_price) <= price_tolerance:
-            return True
-        
-        return False
-    
-    
-    def _has_equivalent_working_order(self, side: Side, target_price: float) -> bool:
-        orders = self.active_bids if side == Side.BUY else self.active_asks
-        for order_view in orders.values():
-            if self._is_quote_equivalent(order_view, target_price, side):
-                return True
-        return False
-    
-    
-    def _cancel_non_equivalent_orders(self, bid_price: float, ask_price: float) -> List[CancelOrderIntent]:
-        intents = []
-        
-        for order_id, order_view in list(self.active_bids.items()):
-            if order_view.lifecycle == OrderLifecycle.WORKING:
-                if not self._is_quote_equivalent(order_view, bid_price, Side.BUY):
-                    intents.append(CancelOrderIntent(
-                        intent_id=self.intent_id,
-                        order_id=order_id
-                    ))
-        
-        for order_id, order_view in list(self.active_asks.items()):
-            if order_view.lifecycle == OrderLifecycle.WORKING:
-                if not self._is_quote_equivalent(order_view, ask_price, Side.SELL):
-                    intents.append(CancelOrderIntent(
-                        intent_id=self.intent_id,
-                        order_id=order_id
-                    ))
+                return TickPlan('PROVIDE', [])
+        
+        needs_refresh = (
+            self.last_quote_global_tick is None
+            or self.order_filled_this_tick
+            or self.layer_changed
+            or (self.last_mid_price is not None and kernels.quote_drift_exceeded(mid_price, self.last_mid_price, self.spread_size))
+            # Order scans only when nothing cheaper triggered
+            or not self.active_bids.has_working()
+            or not self.active_asks.has_working()
+        )
+        if not needs_refresh:
+            return TickPlan('PROVIDE', [])
         
-        return intents
-    
-    
-    def _selective_stabilize_cancel(self, inventory_ratio: float, target_bid: float, target_ask: float) -> List[CancelOrderIntent]:
-        #If inventory_ratio < target (too many shares):
-        #    - We need to SELL → asks are supportive → NEVER cancel asks
-        #    - Cancel non-equivalent BIDS only
+        #Selective cancel
+        cancel_ids: List[int] = []
+        has_equivalent_bid = self.active_bids.scan(bid_price, cancel_ids)
+        has_equivalent_ask = self.active_asks.scan(ask_price, cancel_ids)
         
-        #If inventory_ratio > target (too much cash):
-        #    - We need to BUY → bids are supportive → NEVER cancel bids
-        #    - Cancel non-equivalent ASKS only
-
-        intents = []
+        bid_quantity, ask_quantity = self._validate_quantities(
+            0 if has_equivalent_bid else self.order_size,
+            0 if has_equivalent_ask else self.order_size
+        )
         
-        if inventory_ratio < self.target_inventory_fraction:
-            for order_id, order_view in list(self.active_bids.items()):
-                if order_view.lifecycle == OrderLifecycle.WORKING:
-                    if not self._is_quote_equivalent(order_view, target_bid, Side.BUY):
-                        intents.append(CancelOrderIntent(
-                            intent_id=self.intent_id,
-                            order_id=order_id
-                        ))
-        else:
-            for order_id, order_view in list(self.active_asks.items()):
-                if order_view.lifecycle == OrderLifecycle.WORKING:
-                    if not self._is_quote_equivalent(order_view, target_ask, Side.SELL):
-                        intents.append(CancelOrderIntent(
-                            intent_id=self.intent_id,
-                            order_id=order_id
-                        ))
+        if not cancel_ids and bid_quantity <= 0 and ask_quantity <= 0:
+            return TickPlan('PROVIDE', [])
         
-        return intents
+        return TickPlan('PROVIDE', cancel_ids, bid_price, bid_quantity, ask_price, ask_quantity, mid_price, quoted=True)
     
     
-    def _estimate_price(self, view: AgentView) -> Optional[float]:
-        md = view.market_data_view
-        assert md is not None
-        
-        if md.mid_price is not None:
-            self.last_known_price = md.mid_price
-            return md.mid_price
-        
-        if md.micro_price is not None:
-            self.last_known_price = md.micro_price
-            return md.micro_price
-        
-        if md.last_traded_price is not None:
-            self.last_known_price = md.last_traded_price
-            return md.last_traded_price
+    def _estimate_price(self, md: MarketDataView, economy_insight: EconomyInsightView) -> Optional[float]:
+        #Market side already resolved mid -> micro -> last traded
+        estimated_mid = md.estimated_mid
+        if estimated_mid is not None:
+            self.last_known_price = estimated_mid
+            return estimated_mid
 
         if self.last_known_price is not None:
             return self.last_known_price
 
-        assert view.economy_insight_view is not None
-        tv_l, tv_u = view.economy_insight_view.tv_interval
+        tv_l, tv_u = economy_insight.tv_interval
         
         return (tv_l + tv_u) / 2
     
@@ -585,41 +534,20 @@ class MarketMaker(Agent):
         return cash / total_wealth
     
     
-    def _validate_bid_quantity(self, quantity: int) -> int:
-        if quantity <= 0:
-            return 0
-        
-        cash = self.account_view.cash
-        if cash <= 0:
-            return 0
-        
-        if self.last_known_price is None:
-            return 0
-        
-        cost_per_share = self.last_known_price * (1 + self.constants.fee_rate)
-        max_quantity = int(cash / cost_per_share)
-        
-        return min(quantity, max_quantity)
-    
-    
-    def _validate_ask_quantity(self, quantity: int) -> int:
-        if quantity <= 0:
-            return 0
-        
-        shares = self.account_view.shares
-        return min(quantity, shares)
+    def _validate_quantities(self, bid_quantity: int, ask_quantity: int) -> Tuple[int, int]:
+        return kernels.validated_quantities(
+            bid_quantity,
+            ask_quantity,
+            self.account_view.cash,
+            self.account_view.shares,
+            math.nan if self.last_known_price is None else self.last_known_price,
+            self.constants.fee_rate
+        )
     
     
     def _cleanup_done_orders(self) -> None:
-        for order_id, order_view in list(self.active_bids.items()):
-            if order_view.lifecycle == OrderLifecycle.DONE:
-                if order_view.end_reason == OrderEndReasons.FILLED:
-                    self.order_filled_this_tick = True
-                del self.active_bids[order_id]
+        bid_filled = self.active_bids.remove_done()
+        ask_filled = self.active_asks.remove_done()
         
-
-        for order_id, order_view in list(self.active_asks.items()):
-            if order_view.lifecycle == OrderLifecycle.DONE:
-                if order_view.end_reason == OrderEndReasons.FILLED:
-                    self.order_filled_this_tick = True
-                del self.active_asks[order_id]
+        if bid_filled or ask_filled:
+            self.order_filled_this_tick = True
@@ -0,0 +1,290 @@
+from __future__ import annotations
+from typing import List, Optional, Sequence, Tuple
+import math
+
+import numpy as np
+import numpy.typing as npt
+
+from .market_maker import MarketMaker
+from ._njit import NUMBA_AVAILABLE
+from . import market_maker_kernels as kernels
+from agents.models import AgentView
+from agents.intents import AgentIntent
+
+
+
+class MarketMakerBatch:
+    #Struct-of-Arrays view over a MarketMaker population, lane i <-> agents[i].
+    #Parameters are gathered once, inventory state on every decide_all call, so
+    #every lane is evaluated against the same snapshot. Order reconciliation and
+    #intent emission stay on the agents.
+    #Independent environments (e.g. RL rollouts) stack as shape (E, A), stored
+    #row-major in the same flat lanes so every expression stays one NumPy call.
+    #Ratio-domain columns (fractions, bounds, tolerances, skew factors and the
+    #inventory ratios) may be narrowed to float32 through ratio_dtype, which
+    #halves their traffic but lets layer decisions drift from MarketMaker.decide
+    #near the bounds. Cash and prices always stay float64: prices are settled at
+    #PRICE_SCALE resolution, which float32 cannot represent.
+
+    LAYERS: Tuple[str, ...] = ('SURVIVE', 'STABILIZE', 'PROVIDE')
+
+    agents: List[MarketMaker]
+    shape: Tuple[int, ...] #(A,) or (E, A)
+    ratio_dtype: np.dtype
+
+    #Parameters
+    target_inventory_fraction: np.ndarray
+    risk_lower_bound: np.ndarray
+    risk_upper_bound: np.ndarray
+    stabilization_tolerance: np.ndarray
+    skew_factor: np.ndarray
+    spread_size: np.ndarray
+    fee_rate: np.ndarray
+    order_size: np.ndarray
+    half_spread: np.ndarray
+    panic_offset: np.ndarray
+    panic_cost_coef: np.ndarray
+
+    #State
+    cash: np.ndarray
+    shares: np.ndarray
+    last_known_price: np.ndarray #NaN = unknown
+
+
+    def __init__(
+        self,
+        agents: Sequence[MarketMaker],
+        shape: Optional[Tuple[int, ...]] = None,
+        ratio_dtype: npt.DTypeLike = np.float64
+    ) -> None:
+        self.agents = list(agents)
+        self.shape = (len(self.agents),) if shape is None else shape
+        assert math.prod(self.shape) == len(self.agents)
+
+        self.ratio_dtype = np.dtype(ratio_dtype)
+        assert self.ratio_dtype in (np.float32, np.float64)
+
+        self.target_inventory_fraction = np.array([a.target_inventory_fraction for a in self.agents], dtype=self.ratio_dtype)
+        self.risk_lower_bound = np.array([a.risk_lower_bound for a in self.agents], dtype=self.ratio_dtype)
+        self.risk_upper_bound = np.array([a.risk_upper_bound for a in self.agents], dtype=self.ratio_dtype)
+        self.stabilization_tolerance = np.array([a.stabilization_tolerance for a in self.agents], dtype=self.ratio_dtype)
+        self.skew_factor = np.array([a.skew_factor for a in self.agents], dtype=self.ratio_dtype)
+        self.spread_size = np.array([a.spread_size for a in self.agents], dtype=np.float64)
+        self.fee_rate = np.array([a.constants.fee_rate for a in self.agents], dtype=np.float64)
+        self.order_size = np.array([a.order_size for a in self.agents], dtype=np.int64)
+        self.half_spread = self.spread_size / 2.0
+        self.panic_offset = 5.0 * self.spread_size
+        self.panic_cost_coef = 1 + self.fee_rate
+
+        self.cash = np.zeros(len(self.agents), dtype=np.float64)
+        self.shares = np.zeros(len(self.agents), dtype=np.int64)
+        self.last_known_price = np.full(len(self.agents), np.nan, dtype=np.float64)
+
+
+    @classmethod
+    def from_populations(cls, populations: Sequence[Sequence[MarketMaker]], ratio_dtype: npt.DTypeLike = np.float64) -> MarketMakerBatch:
+        #One population per environment, all of the same size
+
+        agents_per_env = len(populations[0]) if populations else 0
+        assert all(len(population) == agents_per_env for population in populations)
+
+        agents = [agent for population in populations for agent in population]
+        return cls(agents, (len(populations), agents_per_env), ratio_dtype)
+
+
+    def __len__(self) -> int:
+        return len(self.agents)
+
+
+    def decide_populations(self, views: Sequence[Sequence[AgentView]]) -> List[List[List[AgentIntent]]]:
+        #decide_all over (E, A) views, results grouped per environment
+
+        assert len(self.shape) == 2
+        num_envs, agents_per_env = self.shape
+        assert len(views) == num_envs
+
+        results = self.decide_all([view for env_views in views for view in env_views])
+
+        return [results[env * agents_per_env:(env + 1) * agents_per_env] for env in range(num_envs)]
+
+
+    def per_population(self, column: np.ndarray) -> np.ndarray:
+        #Lane column (parameter, state or mask) as an (E, A) view
+        return column.reshape(self.shape)
+
+
+    def decide_all(self, views: Sequence[AgentView]) -> List[List[AgentIntent]]:
+        #Equivalent to [agent.decide(view) for agent, view in zip(agents, views)]
+        #when no order is processed in between.
+
+        assert len(views) == len(self.agents)
+
+        self._gather_state()
+
+        inventory_ratio = self._calculate_inventory_ratios()
+        survive, stabilize = self._calculate_layer_masks(inventory_ratio)
+        layers = np.where(survive, 0, np.where(stabilize, 1, 2))
+
+        # Panic lanes only price an order when they hold something to dump
+        panic_sell = inventory_ratio < self.risk_lower_bound
+        panic_buy = survive & ~panic_sell
+        needs_mid = ~survive | (panic_sell & (self.shares > 0)) | (panic_buy & (self.cash > 0))
+
+        ratios = inventory_ratio.tolist()
+        layer_codes = layers.tolist()
+        panic_sells = panic_sell.tolist()
+        needs_mids = needs_mid.tolist()
+
+        # Mid estimation updates last_known_price, only pricing lanes resolve it here
+        mid_price = np.full(len(self.agents), np.nan, dtype=np.float64)
+        for i, agent in enumerate(self.agents):
+            view = views[i]
+            market_data = view.market_data_view
+            economy_insight = view.economy_insight_view
+            assert view.agent_id == agent.agent_id
+            assert market_data is not None
+            assert economy_insight is not None
+
+            agent._start_tick(view, self.LAYERS[layer_codes[i]], ratios[i])
+
+            if needs_mids[i]:
+                estimate = agent._estimate_price(market_data, economy_insight)
+                if estimate is not None:
+                    mid_price[i] = estimate
+
+        bid_price, ask_price = self._calculate_quotes(mid_price, inventory_ratio, stabilize)
+        panic_price, panic_quantity = self._calculate_panic_orders(mid_price, panic_sell)
+
+        mids = mid_price.tolist()
+        bids = bid_price.tolist()
+        asks = ask_price.tolist()
+        panic_prices = panic_price.tolist()
+        panic_quantities = panic_quantity.tolist()
+
+        results: List[List[AgentIntent]] = []
+        for i, agent in enumerate(self.agents):
+            layer_code = layer_codes[i]
+            intents: List[AgentIntent] = []
+            results.append(intents)
+
+            if layer_code == 0:
+                mid = None if math.isnan(mids[i]) else mids[i]
+                agent._emit_plan(agent._plan_panic(panic_sells[i], mid, panic_prices[i], panic_quantities[i]), intents)
+            elif math.isnan(mids[i]):
+                continue
+            elif layer_code == 1:
+                agent._emit_plan(agent._plan_stabilize(ratios[i], mids[i], bids[i], asks[i]), intents)
+            else:
+                agent._emit_plan(agent._plan_provide(mids[i], bids[i], asks[i]), intents)
+
+        return results
+
+
+    def _gather_state(self) -> None:
+        for i, agent in enumerate(self.agents):
+            self.cash[i] = agent.account_view.cash
+            self.shares[i] = agent.account_view.shares
+            self.last_known_price[i] = np.nan if agent.last_known_price is None else agent.last_known_price
+
+
+    def _calculate_inventory_ratios(self) -> np.ndarray:
+        #0.0 = all shares, 0.5 = balanced, 1.0 = all cash
+
+        total_wealth = self.cash + self.shares * self.last_known_price
+
+        inventory_ratio = self.target_inventory_fraction.copy()
+        # Narrowed on store when ratio_dtype is float32
+        np.divide(self.cash, total_wealth, out=inventory_ratio, where=total_wealth > 0)
+
+        return inventory_ratio
+
+
+    def _calculate_layer_masks(self, inventory_ratio: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        survive = (inventory_ratio < self.risk_lower_bound) | (inventory_ratio > self.risk_upper_bound)
+        deviation = np.abs(inventory_ratio - self.target_inventory_fraction)
+        stabilize = ~survive & (deviation > self.stabilization_tolerance)
+
+        return survive, stabilize
+
+
+    def _calculate_quotes(self, mid_price: np.ndarray, inventory_ratio: np.ndarray, stabilize: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if NUMBA_AVAILABLE:
+            # Lanes are independent, the compiled kernel splits them across threads
+            bid_price = np.full(len(self.agents), np.nan, dtype=np.float64)
+            ask_price = np.full(len(self.agents), np.nan, dtype=np.float64)
+            kernels.batch_quotes(
+                mid_price,
+                inventory_ratio,
+                stabilize,
+                self.target_inventory_fraction,
+                self.skew_factor,
+                self.half_spread,
+                self.fee_rate,
+                bid_price,
+                ask_price
+            )
+            return bid_price, ask_price
+
+        skew = self._calculate_skews(inventory_ratio)
+        stabilize_bid, stabilize_ask = self._calculate_skewed_prices(mid_price, skew)
+        provide_bid, provide_ask = self._calculate_provide_prices(mid_price)
+
+        return np.where(stabilize, stabilize_bid, provide_bid), np.where(stabilize, stabilize_ask, provide_ask)
+
+
+    def _calculate_skews(self, inventory_ratio: np.ndarray) -> np.ndarray:
+        return -(inventory_ratio - self.target_inventory_fraction) * self.skew_factor
+
+
+    def _calculate_skewed_prices(self, mid_price: np.ndarray, skew: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        price_shift = np.sign(skew) * np.minimum(np.abs(skew / 100.0 * mid_price), self.half_spread)
+        shifted_mid = mid_price + price_shift
+
+        fee_per_share = mid_price * self.fee_rate
+
+        bid_price = shifted_mid - self.half_spread - fee_per_share
+        ask_price = shifted_mid + self.half_spread + fee_per_share
+        np.maximum(bid_price, 0.01, out=bid_price)
+        np.maximum(ask_price, 0.01, out=ask_price)
+
+        # Ensure bid < ask
+        crossed = bid_price >= ask_price
+        spread = np.maximum(1.0, self.half_spread)
+        np.copyto(bid_price, mid_price - spread, where=crossed)
+        np.copyto(ask_price, mid_price + spread, where=crossed)
+
+        return bid_price, ask_price
+
+
+    def _calculate_provide_prices(self, mid_price: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        fee_per_share = self.fee_rate * mid_price
+
+        bid_price = mid_price - self.half_spread - fee_per_share
+        ask_price = mid_price + self.half_spread + fee_per_share
+        np.maximum(bid_price, 0.01, out=bid_price)
+        np.maximum(ask_price, 0.01, out=ask_price)
+
+        return bid_price, ask_price
+
+
+    def _calculate_panic_orders(self, mid_price: np.ndarray, panic_sell: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        #Per lane panic (price, quantity), sell or buy side chosen by panic_sell.
+        #Lanes without a mid get quantity 0.
+
+        priced = ~np.isnan(mid_price)
+        max_quantity = self.order_size * 3 # Larger size in panic
+
+        sell_price = mid_price - self.panic_offset
+        np.maximum(sell_price, 0.01, out=sell_price)
+        sell_quantity = np.minimum(self.shares, max_quantity)
+
+        buy_price = mid_price + self.panic_offset
+        affordable = np.zeros(len(self.agents), dtype=np.float64)
+        np.divide(self.cash, buy_price * self.panic_cost_coef, out=affordable, where=priced)
+        buy_quantity = np.minimum(np.trunc(affordable).astype(np.int64), max_quantity)
+
+        price = np.where(panic_sell, sell_price, buy_price)
+        quantity = np.where(panic_sell, sell_quantity, buy_quantity)
+        quantity[~priced] = 0
+
+        return price, quantity
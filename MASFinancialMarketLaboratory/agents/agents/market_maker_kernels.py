@@ -0,0 +1,172 @@
+from __future__ import annotations
+from typing import Tuple
+import math
+
+import numpy as np
+
+from ._njit import njit, prange
+
+
+
+#Scalar MarketMaker arithmetic, compiled with numba when available.
+#Related steps are grouped per kernel so each call amortizes its dispatch cost.
+
+
+@njit(cache=True)
+def skewed_quotes(
+    mid_price: float,
+    inventory_ratio: float,
+    target_inventory_fraction: float,
+    skew_factor: int,
+    half_spread: float,
+    fee_rate: float
+) -> Tuple[float, float]:
+    #Positive skew = need to buy (shift quotes up)
+    #Negative skew = need to sell (shift quotes down)
+    
+    skew = -(inventory_ratio - target_inventory_fraction) * skew_factor
+    
+    max_shift = half_spread  # ±1 tick absolute
+    
+    skew_direction = 1 if skew > 0 else -1 if skew < 0 else 0
+    price_shift = skew_direction * min(abs(skew / 100.0 * mid_price), max_shift)
+    
+    shifted_mid = mid_price + price_shift
+    fee_per_share = mid_price * fee_rate
+    
+    bid_price = max(0.01, shifted_mid - half_spread - fee_per_share)
+    ask_price = max(0.01, shifted_mid + half_spread + fee_per_share)
+    
+    if bid_price >= ask_price:
+        # Ensure bid < ask
+        spread = max(1.0, half_spread)
+        bid_price = mid_price - spread
+        ask_price = mid_price + spread
+    
+    return bid_price, ask_price
+
+
+@njit(cache=True)
+def skewed_quantities(inventory_ratio: float, target_inventory_fraction: float, order_size: int) -> Tuple[int, int]:
+    deviation = abs(inventory_ratio - target_inventory_fraction)
+    
+    # Base: 2x supportive, 0.5x risk-creating
+    supportive_multiplier = min(2.0 + deviation * 2, 3.0)  # Cap at 3x
+    risk_multiplier = max(0.5 - deviation, 0.25)  # Floor at 0.25x
+    
+    if inventory_ratio > target_inventory_fraction:
+        # Too much cash - bigger bid (supportive), smaller ask (risk)
+        return int(order_size * supportive_multiplier), int(order_size * risk_multiplier)
+    
+    # Too many shares - smaller bid (risk), bigger ask (supportive)
+    return int(order_size * risk_multiplier), int(order_size * supportive_multiplier)
+
+
+@njit(cache=True)
+def provide_quotes(mid_price: float, half_spread: float, fee_rate: float) -> Tuple[float, float]:
+    #Half of the round-trip fee (2 * fee_rate * mid) on each side
+    fee_per_share = fee_rate * mid_price
+    
+    bid_price = mid_price - half_spread - fee_per_share
+    ask_price = mid_price + half_spread + fee_per_share
+    
+    return max(0.01, bid_price), max(0.01, ask_price)
+
+
+@njit(cache=True)
+def panic_sell_order(mid_price: float, panic_offset: float, shares: int, max_quantity: int) -> Tuple[float, int]:
+    return max(0.01, mid_price - panic_offset), min(shares, max_quantity)
+
+
+@njit(cache=True)
+def panic_buy_order(mid_price: float, panic_offset: float, cash: float, cost_coef: float, max_quantity: int) -> Tuple[float, int]:
+    panic_buy_price = mid_price + panic_offset
+    
+    # Calculate affordable quantity
+    cost_per_share = panic_buy_price * cost_coef
+    
+    return panic_buy_price, min(int(cash / cost_per_share), max_quantity)
+
+
+@njit(cache=True)
+def affordable_quantity(quantity: int, cash: float, price: float, fee_rate: float) -> int:
+    cost_per_share = price * (1 + fee_rate)
+    max_quantity = int(cash / cost_per_share)
+    
+    return min(quantity, max_quantity)
+
+
+@njit(cache=True)
+def validated_quantities(bid_quantity: int, ask_quantity: int, cash: float, shares: int, price: float, fee_rate: float) -> Tuple[int, int]:
+    #Caps a quote pair by what the account can pay for and deliver, NaN price = unknown
+    
+    if bid_quantity <= 0 or cash <= 0 or math.isnan(price):
+        bid_quantity = 0
+    else:
+        bid_quantity = affordable_quantity(bid_quantity, cash, price, fee_rate)
+    
+    if ask_quantity <= 0:
+        ask_quantity = 0
+    else:
+        ask_quantity = min(ask_quantity, shares)
+    
+    return bid_quantity, ask_quantity
+
+
+@njit(cache=True)
+def stabilize_quantities(
+    inventory_ratio: float,
+    target_inventory_fraction: float,
+    order_size: int,
+    cash: float,
+    shares: int,
+    price: float,
+    fee_rate: float
+) -> Tuple[int, int]:
+    bid_quantity, ask_quantity = skewed_quantities(inventory_ratio, target_inventory_fraction, order_size)
+    
+    return validated_quantities(bid_quantity, ask_quantity, cash, shares, price, fee_rate)
+
+
+@njit(cache=True)
+def quote_drift_exceeded(current_mid_price: float, last_mid_price: float, spread_size: int) -> bool:
+    if last_mid_price > 0:
+        drift = abs(current_mid_price - last_mid_price) / last_mid_price
+        drift_tolerance = spread_size / (2 * last_mid_price)
+    else:
+        drift = 0.0
+        drift_tolerance = 0.01
+    
+    return drift > drift_tolerance
+
+
+@njit(parallel=True, nogil=True, cache=True)
+def batch_quotes(
+    mid_price: np.ndarray,
+    inventory_ratio: np.ndarray,
+    stabilize: np.ndarray,
+    target_inventory_fraction: np.ndarray,
+    skew_factor: np.ndarray,
+    half_spread: np.ndarray,
+    fee_rate: np.ndarray,
+    bid_out: np.ndarray,
+    ask_out: np.ndarray
+) -> None:
+    #MarketMakerBatch quotes, lanes are independent so they run across threads.
+    #Lanes without a mid (NaN) are left untouched.
+    
+    for i in prange(mid_price.shape[0]):
+        if math.isnan(mid_price[i]):
+            continue
+        
+        if stabilize[i]:
+            bid_out[i], ask_out[i] = skewed_quotes(
+                mid_price[i],
+                inventory_ratio[i],
+                target_inventory_fraction[i],
+                skew_factor[i],
+                half_spread[i],
+                fee_rate[i]
+            )
+        else:
+            bid_out[i], ask_out[i] = provide_quotes(mid_price[i], half_spread[i], fee_rate[i])
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import numpy as np
+
+from ._njit import njit, guvectorize
+
+
+
+#Scalar MomentumTrader arithmetic, compiled with numba when available.
+#No fastmath: sums keep their sequential order so signals match the plain loop.
+
+
+@njit(cache=True)
+def weighted_momentum(prices: np.ndarray) -> float:
+    #Weighted mean of consecutive returns, return i (1-based) has weight i.
+    #Non-positive previous prices carry no return and no weight.
+    
+    total_weight = 0.0
+    weighted_return = 0.0
+    
+    for i in range(1, prices.shape[0]):
+        price_prev = prices[i - 1]
+        
+        if price_prev > 0:
+            ret = (prices[i] - price_prev) / price_prev
+            
+            weighted_return += ret * i
+            total_weight += i
+    
+    if total_weight > 0:
+        return weighted_return / total_weight
+    
+    return 0.0
+
+
+def _lane_momentum(prices: np.ndarray, count: int, out: np.ndarray) -> None:
+    #MomentumTraderBatch row: weighted_momentum over the last count prices of a
+    #right-aligned price window, same summation order as the per-agent kernel.
+    
+    first = prices.shape[0] - count
+    
+    total_weight = 0.0
+    weighted_return = 0.0
+    
+    for i in range(max(first, 0) + 1, prices.shape[0]):
+        price_prev = prices[i - 1]
+        
+        if price_prev > 0:
+            ret = (prices[i] - price_prev) / price_prev
+            weight = i - first
+            
+            weighted_return += ret * weight
+            total_weight += weight
+    
+    if total_weight > 0:
+        out[0] = weighted_return / total_weight
+    else:
+        out[0] = 0.0
+
+
+#Row-wise gufuncs, (N, window) prices and (N,) counts -> (N,) momentum.
+#The parallel target only pays off once there are enough rows to split across threads.
+LANE_MOMENTUM_SIGNATURE = ["void(float64[:], int64, float64[:])"]
+
+lane_momentum = guvectorize(LANE_MOMENTUM_SIGNATURE, "(w),()->()", nopython=True, cache=True)(_lane_momentum)
+lane_momentum_parallel = guvectorize(LANE_MOMENTUM_SIGNATURE, "(w),()->()", nopython=True, target="parallel", cache=True)(_lane_momentum)
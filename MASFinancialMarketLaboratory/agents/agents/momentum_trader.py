@@ -1,17 +1,40 @@
 from __future__ import annotations
-from typing import List, Dict, Optional
+from typing import Callable, Dict, Optional, Iterator, Sequence, Tuple
+import itertools
 
-from .agent import Agent
+import numpy as np
+
+from .agent import Agent, _NO_INTENTS
+from . import momentum_kernels as kernels
 from agents.models import AgentView, AgentConstants, AgentFeedback
 from agents.intents import AgentIntent, PlaceOrderIntent
 
-from environment.views import AccountView, OrderView
+from environment.views import AccountView, OrderView, MarketDataView
 from environment.models.order import OrderType, Side, OrderLifecycle
 
 
 
 class MomentumTrader(Agent):
     #OBSERVE → EVALUATE → ACT
+    
+    ORDER_SWEEP_INTERVAL: int = 32 #Updates between sweeps of active_orders
+    
+    __slots__ = (
+        "momentum_window",
+        "entry_threshold",
+        "exit_threshold",
+        "aggressiveness",
+        "max_exposure_fraction",
+        "directional_bias",
+        "liquidity_baseline",
+        "_price_buffer",
+        "_price_count",
+        "_price_head",
+        "_momentum",
+        "active_orders",
+        "_updates_since_sweep",
+        "_intent_counter"
+    )
         
     # Signal Parameters
     momentum_window: int
@@ -24,10 +47,16 @@ class MomentumTrader(Agent):
     directional_bias: float
     liquidity_baseline: int
     
-    price_history: List[float]
+    # Mirrored ring buffer: each price is written at slot and slot + momentum_window,
+    # so the last momentum_window prices are always one contiguous slice
+    _price_buffer: np.ndarray
+    _price_count: int
+    _price_head: int #Slot of the oldest price once the window is full
+    _momentum: Optional[float] #Signal of the current history, None = not computed yet
     active_orders: Dict[int, OrderView]
+    _updates_since_sweep: int
     
-    __intent_id: int
+    _intent_counter: Iterator[int]
     
     
     def __init__(
@@ -55,58 +84,90 @@ class MomentumTrader(Agent):
         self.directional_bias = directional_bias
         self.liquidity_baseline = liquidity_baseline
         
-        self.price_history = []
+        self._price_buffer = np.empty(2 * momentum_window, dtype=np.float64)
+        self._price_count = 0
+        self._price_head = 0
+        self._momentum = None
         self.active_orders = {}
+        self._updates_since_sweep = 0
         
-        self.__intent_id = 0
+        self._intent_counter = itertools.count()
     
     
-    @property
-    def intent_id(self) -> int:
-        intent_id = self.__intent_id
-        self.__intent_id += 1
-        return intent_id
-
-    
-    def decide(self, view: AgentView) -> List[AgentIntent]:
+    def decide(self, view: AgentView) -> Sequence[AgentIntent]:
+        md = view.market_data_view
         assert view.agent_id == self.agent_id
-        assert view.market_data_view is not None
+        assert md is not None
         
         # OBSERVE: Update price history
-        self._update_price_history(view)
+        current_price = self._market_price(md)
+        self._update_price_history(current_price)
+        
+        # EVALUATE: Biased momentum against the entry / exit thresholds
+        biased_momentum = self._calculate_momentum_signal() + self.directional_bias
         
-        # EVALUATE: Calculate momentum and evaluate signal
-        momentum = self._calculate_momentum_signal()
-        biased_momentum = self._apply_directional_bias(momentum)
-        signal = self._evaluate_signal(biased_momentum)
+        # Signal code: 1 long, 2 short, 3 exit, 0 hold
+        entry_threshold = self.entry_threshold
+        signal = (
+            1 if biased_momentum > entry_threshold else
+            2 if biased_momentum < -entry_threshold else
+            3 if abs(biased_momentum) < self.exit_threshold else
+            0
+        )
         
         # ACT: Execute based on signal
-        return self._act_on_signal(signal, view)
+        return self._ACTIONS[signal](self, view, current_price)
     
     
     def update(self, feedback: AgentFeedback) -> None:
         for _, order_view in feedback.order_results.items():
-            if order_view is not None:
+            # Market orders mostly complete while being placed, those are never tracked
+            if order_view is not None and order_view.lifecycle != OrderLifecycle.DONE:
                 self.active_orders[order_view.order_id] = order_view
         
-        self._cleanup_done_orders()
+        # Tracked orders also complete through other agents' fills or expiry,
+        # which send no feedback, so they are swept periodically
+        self._updates_since_sweep += 1
+        if self._updates_since_sweep >= self.ORDER_SWEEP_INTERVAL:
+            self._updates_since_sweep = 0
+            self._cleanup_done_orders()
     
     
-    def _update_price_history(self, view: AgentView) -> None:
-        current_price = self._get_current_price(view)
+    def _update_price_history(self, current_price: Optional[float]) -> None:
         if current_price is None:
             return
         
-        self.price_history.append(current_price)
+        window = self.momentum_window
+        if window <= 0:
+            return
         
-        if len(self.price_history) > self.momentum_window:
-            self.price_history.pop(0)
+        if self._price_count < window:
+            slot = self._price_count
+            self._price_count += 1
+        else:
+            # Overwrite the oldest price
+            slot = self._price_head
+            self._price_head = (slot + 1) % window
+        
+        self._price_buffer[slot] = current_price
+        self._price_buffer[slot + window] = current_price
+        
+        # Even a repeated price shifts the window, only ticks without a price keep the signal
+        self._momentum = None
     
     
-    def _get_current_price(self, view: AgentView) -> Optional[float]:
-        md = view.market_data_view
-        assert md is not None
+    @property
+    def price_history(self) -> np.ndarray:
+        #Last momentum_window prices, oldest first (view into the ring buffer)
         
+        if self._price_count < self.momentum_window:
+            return self._price_buffer[:self._price_count]
+        
+        return self._price_buffer[self._price_head:self._price_head + self.momentum_window]
+    
+    
+    @staticmethod
+    def _market_price(md: MarketDataView) -> Optional[float]:
         if md.last_traded_price is not None:
             return md.last_traded_price
         
@@ -122,46 +183,13 @@ class MomentumTrader(Agent):
     def _calculate_momentum_signal(self) -> float:
         #Weighted momentum - recent prices matter more.
 
-        if len(self.price_history) < 2:
-            return 0.0
-        
-        total_weight = 0.0
-        weighted_return = 0.0
-        
-        for i in range(1, len(self.price_history)):
-            price_prev = self.price_history[i-1]
-            price_curr = self.price_history[i]
-            
-            if price_prev > 0:
-                ret = (price_curr - price_prev) / price_prev
-                weight = i
-                
-                weighted_return += ret * weight
-                total_weight += weight
-        
-        if total_weight > 0:
-            return weighted_return / total_weight
+        momentum = self._momentum
+        if momentum is None:
+            momentum = kernels.weighted_momentum(self.price_history)
+            self._momentum = momentum
         
-        return 0.0
-    
+        return momentum
     
-    def _apply_directional_bias(self, momentum: float) -> float:
-        biased_momentum = momentum + self.directional_bias
-        return biased_momentum
-    
-    
-    def _evaluate_signal(self, biased_momentum: float) -> str:
-        if biased_momentum > self.entry_threshold:
-            return 'ENTER_LONG'
-        
-        if biased_momentum < -self.entry_threshold:
-            return 'ENTER_SHORT'
-        
-        if abs(biased_momentum) < self.exit_threshold:
-            return 'EXIT'
-        
-        return 'HOLD'
-
     
     def _calculate_liquidity_amplifier(self, view: AgentView) -> float:
         #Amplify aggressiveness when market liquidity is low.
@@ -170,15 +198,10 @@ class MomentumTrader(Agent):
         md = view.market_data_view
         assert md is not None
 
-        total_liquidity = 0
-        
-        if md.L1_bids is not None:
-            # L1_bids = (price, size, #orders)
-            total_liquidity += md.L1_bids[1]
-        
-        if md.L1_asks is not None:
-            # L1_asks = (price, size, #orders)
-            total_liquidity += md.L1_asks[1]
+        # L1_bids / L1_asks = (price, size, #orders)
+        L1_bids = md.L1_bids
+        L1_asks = md.L1_asks
+        total_liquidity = (0 if L1_bids is None else L1_bids[1]) + (0 if L1_asks is None else L1_asks[1])
         
         if total_liquidity == 0:
             return 1.0
@@ -191,28 +214,13 @@ class MomentumTrader(Agent):
         return amplifier
     
         
-    def _act_on_signal(self, signal: str, view: AgentView) -> List[AgentIntent]:
-        if signal == 'ENTER_LONG':
-            return self._enter_long(view)
-        
-        elif signal == 'ENTER_SHORT':
-            return self._enter_short(view)
-        
-        elif signal == 'EXIT':
-            return self._exit_position(view)
-        
-        else:
-            return []
-    
-    
-    def _enter_long(self, view: AgentView) -> List[AgentIntent]:
+    def _enter_long(self, view: AgentView, current_price: Optional[float]) -> Sequence[AgentIntent]:
         cash = self.account_view.cash
         shares = self.account_view.shares
         
         # Calculate position size
-        current_price = self._get_current_price(view)
         if current_price is None:
-            return []
+            return _NO_INTENTS
         
         # Total wealth
         total_wealth = cash + shares * current_price
@@ -229,18 +237,18 @@ class MomentumTrader(Agent):
         additional_shares = target_shares - shares
         
         if additional_shares <= 0:
-            return []  
+            return _NO_INTENTS
         
-        cost = additional_shares * current_price * (1 + self.constants.fee_rate)
+        cost = additional_shares * current_price * self._fee_multiplier
         if cost > cash:
-            additional_shares = int(cash / (current_price * (1 + self.constants.fee_rate)))
+            additional_shares = int(cash / (current_price * self._fee_multiplier))
         
         if additional_shares <= 0:
-            return []
+            return _NO_INTENTS
         
         return [
             PlaceOrderIntent(
-                intent_id=self.intent_id,
+                intent_id=next(self._intent_counter),
                 side=Side.BUY,
                 order_type=OrderType.MARKET,
                 quantity=additional_shares,
@@ -249,18 +257,17 @@ class MomentumTrader(Agent):
         ]
     
     
-    def _enter_short(self, view: AgentView) -> List[AgentIntent]:
+    def _enter_short(self, view: AgentView, current_price: Optional[float]) -> Sequence[AgentIntent]:
         #'Short' by selling shares (reduce long position).
         
         shares = self.account_view.shares
         
         if shares <= 0:
-            return []
+            return _NO_INTENTS
         
         # Calculate how much to sell
-        current_price = self._get_current_price(view)
         if current_price is None:
-            return []
+            return _NO_INTENTS
         
         # Liquidity amplifier
         liquidity_amp = self._calculate_liquidity_amplifier(view)
@@ -272,11 +279,11 @@ class MomentumTrader(Agent):
         sell_quantity = min(sell_quantity, shares)  # Can't sell more than we have
         
         if sell_quantity <= 0:
-            return []
+            return _NO_INTENTS
         
         return [
             PlaceOrderIntent(
-                intent_id=self.intent_id,
+                intent_id=next(self._intent_counter),
                 side=Side.SELL,
                 order_type=OrderType.MARKET,
                 quantity=sell_quantity,
@@ -285,15 +292,15 @@ class MomentumTrader(Agent):
         ]
     
     
-    def _exit_position(self, view: AgentView) -> List[AgentIntent]:
-        _ = view
+    def _exit_position(self, view: AgentView, current_price: Optional[float]) -> Sequence[AgentIntent]:
+        _ = view, current_price
         shares = self.account_view.shares
             
         # Aggressive liquidation
         if shares > 0:
             return [
                 PlaceOrderIntent(
-                    intent_id=self.intent_id,
+                    intent_id=next(self._intent_counter),
                     side=Side.SELL,
                     order_type=OrderType.MARKET,
                     quantity=shares,
@@ -301,10 +308,19 @@ class MomentumTrader(Agent):
                 )
             ]
         
-        return []
+        return _NO_INTENTS
+    
+    
+    def _hold(self, view: AgentView, current_price: Optional[float]) -> Sequence[AgentIntent]:
+        _ = view, current_price
+        return _NO_INTENTS
+    
+    
+    #Signal code -> action, shared with MomentumTraderBatch
+    _ACTIONS: Tuple[Callable[[MomentumTrader, AgentView, Optional[float]], Sequence[AgentIntent]], ...] = (_hold, _enter_long, _enter_short, _exit_position)
     
         
     def _cleanup_done_orders(self) -> None:
-        for order_id, order_view in list(self.active_orders.items()):
-            if order_view.lifecycle == OrderLifecycle.DONE:
-                del self.active_orders[order_id]
+        done_ids = [order_id for order_id, order_view in self.active_orders.items() if order_view.lifecycle == OrderLifecycle.DONE]
+        for order_id in done_ids:
+            del self.active_orders[order_id]
@@ -0,0 +1,188 @@
+from __future__ import annotations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .momentum_trader import MomentumTrader
+from ._njit import NUMBA_AVAILABLE
+from . import momentum_kernels as kernels
+from agents.models import AgentView
+from agents.intents import AgentIntent
+
+from environment.views import MarketDataView
+
+
+
+class MomentumTraderBatch:
+    #Struct-of-Arrays view over a MomentumTrader population, lane i <-> agents[i].
+    #Momentum traders only read the market snapshot to form a signal, so every
+    #lane appends the same price per tick and one vectorized pass evaluates all
+    #signals. Position sizing reads the live account, so intents are still built
+    #per agent at its own turn through decide.
+    #The batch owns the price history from construction on (seeded from each
+    #agent's buffer), a population is driven either through the batch or through
+    #MomentumTrader.decide, not both.
+
+    SIGNALS: Tuple[str, ...] = ('HOLD', 'ENTER_LONG', 'ENTER_SHORT', 'EXIT') #Code order of MomentumTrader._ACTIONS
+    PARALLEL_MIN_LANES: int = 10_000 #Below this thread start-up outweighs the split
+
+    agents: List[MomentumTrader]
+    lanes: Dict[int, int] #agent_id -> lane
+
+    #Parameters
+    momentum_window: np.ndarray
+    entry_threshold: np.ndarray
+    exit_threshold: np.ndarray
+    directional_bias: np.ndarray
+
+    #State
+    window: int #Widest momentum_window, column count of the price matrix
+    price_count: np.ndarray #Prices held per lane, capped at its momentum_window
+    # Mirrored ring shared by all lanes: each price is written at column slot and
+    # slot + window, so the last window prices are one contiguous (N, window) view.
+    # Lanes keep their history right-aligned, columns before it hold 0.0
+    _price_buffer: np.ndarray
+    _price_head: int
+    _momentum: Optional[np.ndarray] #Momentum of the current histories, None = not computed yet
+    _signals: List[int] #SIGNALS codes of the last observe, per lane
+    _current_price: Optional[float] #Market price of the last observe
+
+
+    def __init__(self, agents: Sequence[MomentumTrader]) -> None:
+        self.agents = list(agents)
+        self.lanes = {agent.agent_id: i for i, agent in enumerate(self.agents)}
+
+        self.momentum_window = np.array([a.momentum_window for a in self.agents], dtype=np.int64)
+        self.entry_threshold = np.array([a.entry_threshold for a in self.agents], dtype=np.float64)
+        self.exit_threshold = np.array([a.exit_threshold for a in self.agents], dtype=np.float64)
+        self.directional_bias = np.array([a.directional_bias for a in self.agents], dtype=np.float64)
+
+        self.window = max(int(self.momentum_window.max(initial=0)), 1)
+        self.price_count = np.zeros(len(self.agents), dtype=np.int64)
+        self._price_buffer = np.zeros((len(self.agents), 2 * self.window), dtype=np.float64)
+        self._price_head = 0
+        self._momentum = None
+        self._signals = [0] * len(self.agents)
+        self._current_price = None
+
+        for i, agent in enumerate(self.agents):
+            history = agent.price_history
+            count = history.shape[0]
+            self.price_count[i] = count
+            self._price_buffer[i, self.window - count:self.window] = history
+
+        self._price_buffer[:, self.window:] = self._price_buffer[:, :self.window]
+
+
+    def __len__(self) -> int:
+        return len(self.agents)
+
+
+    @property
+    def price_window(self) -> np.ndarray:
+        #(N, window) view of the last window prices, oldest first
+        return self._price_buffer[:, self._price_head:self._price_head + self.window]
+
+
+    def observe(self, market_data: MarketDataView) -> np.ndarray:
+        #OBSERVE and EVALUATE for every lane, returns the SIGNALS codes
+
+        current_price = MomentumTrader._market_price(market_data)
+        if current_price is not None:
+            self._append_price(current_price)
+        self._current_price = current_price
+
+        # Histories only stay unchanged on ticks without a price
+        if current_price is not None or self._momentum is None:
+            self._momentum = self._calculate_momentum_signals()
+        momentum = self._momentum
+
+        biased_momentum = momentum + self.directional_bias
+        signals = self._evaluate_signals(biased_momentum)
+
+        self._signals = signals.tolist()
+        return signals
+
+
+    def decide(self, view: AgentView) -> Sequence[AgentIntent]:
+        #ACT for one agent on the signal of the last observe
+
+        lane = self.lanes[view.agent_id]
+        agent = self.agents[lane]
+
+        return agent._ACTIONS[self._signals[lane]](agent, view, self._current_price)
+
+
+    def decide_all(self, views: Sequence[AgentView]) -> List[Sequence[AgentIntent]]:
+        #Equivalent to [agent.decide(view) for agent, view in zip(agents, views)]
+        #for views sharing one market snapshot.
+
+        assert len(views) == len(self.agents)
+        if not views:
+            return []
+
+        market_data = views[0].market_data_view
+        assert market_data is not None
+        assert all(view.market_data_view is market_data for view in views)
+
+        self.observe(market_data)
+
+        return [self.decide(view) for view in views]
+
+
+    def _append_price(self, price: float) -> None:
+        # Overwrite the oldest column
+        slot = self._price_head
+        self._price_buffer[:, slot] = price
+        self._price_buffer[:, slot + self.window] = price
+        self._price_head = (slot + 1) % self.window
+
+        np.minimum(self.price_count + 1, self.momentum_window, out=self.price_count)
+
+
+    def _calculate_momentum_signals(self) -> np.ndarray:
+        #Weighted momentum per lane - recent prices matter more.
+
+        prices = self.price_window
+
+        if NUMBA_AVAILABLE:
+            # One compiled pass per row, no temporaries
+            momentum = np.empty(len(self.agents), dtype=np.float64)
+            if len(self.agents) >= self.PARALLEL_MIN_LANES:
+                kernels.lane_momentum_parallel(prices, self.price_count, momentum)
+            else:
+                kernels.lane_momentum(prices, self.price_count, momentum)
+            return momentum
+
+        price_prev = prices[:, :-1]
+        price_curr = prices[:, 1:]
+
+        # Return j of a lane weighs j - first + 1, returns before its history weigh 0
+        first = self.window - self.price_count
+        weights = np.arange(self.window - 1, dtype=np.float64) - first[:, None] + 1.0
+        np.maximum(weights, 0.0, out=weights)
+
+        # Non-positive prices carry no return and no weight
+        valid = price_prev > 0
+        weights *= valid
+        returns = np.divide(price_curr - price_prev, price_prev, out=np.zeros_like(price_prev), where=valid)
+
+        weighted_return = (returns * weights).sum(axis=1)
+        total_weight = weights.sum(axis=1)
+
+        momentum = np.zeros(len(self.agents), dtype=np.float64)
+        np.divide(weighted_return, total_weight, out=momentum, where=total_weight > 0)
+
+        return momentum
+
+
+    def _evaluate_signals(self, biased_momentum: np.ndarray) -> np.ndarray:
+        return np.select(
+            [
+                biased_momentum > self.entry_threshold,
+                biased_momentum < -self.entry_threshold,
+                np.abs(biased_momentum) < self.exit_threshold
+            ],
+            [1, 2, 3],
+            default=0
+        )
@@ -1,5 +1,6 @@
 from __future__ import annotations
-from typing import List
+from typing import List, Iterator
+import itertools
 import random
 
 from .agent import Agent
@@ -19,7 +20,7 @@ class NoiseTrader(Agent):
     max_quantity:int
     price_offset_ticks:int
     
-    __intent_id:int
+    _intent_counter:Iterator[int]
 
     
     def __init__(
@@ -45,53 +46,49 @@ class NoiseTrader(Agent):
         self.max_quantity = max_quantity
         self.price_offset_ticks = price_offset_ticks
 
-        self.__intent_id = 0
+        self._intent_counter = itertools.count()
 
 
-    @property
-    def intent_id(self) -> int:
-        intent_id = self.__intent_id
-        self.__intent_id += 1
-
-        return intent_id
-        
-    
     def decide(self, view:AgentView) -> List[AgentIntent]:
+        md = view.market_data_view
         assert view.agent_id == self.agent_id
-        assert view.market_data_view is not None
+        assert md is not None
         assert view.economy_insight_view is None
         
-        cash = self.account_view.cash
-        shares = self.account_view.shares
-        
-        if self.rng.random() > self.p_trade:
+        rng = self.rng
+        if rng.random() > self.p_trade:
             return []
+        
+        # Read after the p_trade draw, most ticks never trade
+        account_view = self.account_view
+        cash = account_view.cash
+        shares = account_view.shares
 
-        side = Side.BUY if self.rng.random() < self.p_buy else Side.SELL
-        quantity = self.rng.randint(self.min_quantity, self.max_quantity)
+        side = Side.BUY if rng.random() < self.p_buy else Side.SELL
+        quantity = rng.randint(self.min_quantity, self.max_quantity)
 
         if side == Side.SELL:
             if shares < quantity:
                 return []
 
         
-        order_type = OrderType.MARKET if self.rng.random() < self.p_market_order else OrderType.LIMIT 
+        order_type = OrderType.MARKET if rng.random() < self.p_market_order else OrderType.LIMIT 
 
         price = None
         
         if order_type == OrderType.MARKET:
-            mid_price = view.market_data_view.mid_price
+            mid_price = md.mid_price
             if mid_price is not None:
-                estimated_required_cash = mid_price * quantity * (1 + self.constants.fee_rate) 
+                estimated_required_cash = mid_price * quantity * self._fee_multiplier
                 if cash < estimated_required_cash:
                     return []
 
         elif order_type == OrderType.LIMIT:
-            mid_price = view.market_data_view.mid_price
+            mid_price = md.mid_price
             if mid_price is None:
                 return []
 
-            offset = self.rng.randint(0, self.price_offset_ticks)
+            offset = rng.randint(0, self.price_offset_ticks)
 
             if side == Side.BUY:
                 price = max(0.0, mid_price - offset)
@@ -102,7 +99,7 @@ class NoiseTrader(Agent):
                 
         return [
             PlaceOrderIntent(
-                intent_id = self.intent_id, 
+                intent_id = next(self._intent_counter), 
                 side=side,
                 order_type=order_type,
                 quantity=quantity,
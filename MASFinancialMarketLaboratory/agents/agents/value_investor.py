@@ -1,12 +1,14 @@
 from __future__ import annotations
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Sequence, Tuple, Iterator
+import itertools
 from enum import Enum
+import heapq
 
-from .agent import Agent
+from .agent import Agent, _NO_INTENTS
 from agents.models import AgentView, AgentConstants, AgentFeedback
 from agents.intents import AgentIntent, PlaceOrderIntent, CreateDepositIntent
 
-from environment.views import AccountView, OrderView, DepositView
+from environment.views import AccountView, OrderView, DepositView, EconomyInsightView
 from environment.models.order import OrderType, Side, OrderLifecycle
 
 
@@ -18,6 +20,34 @@ class Intention(Enum):
 
 
 class ValueInvestor(Agent):    
+    ORDER_SWEEP_INTERVAL: int = 32 #Updates between sweeps of pending_orders
+    
+    __slots__ = (
+        "initial_optimism",
+        "stubbornness",
+        "belief_update_rate",
+        "mispricing_threshold",
+        "max_position_fraction",
+        "deposit_affinity",
+        "deposit_allocation_fraction",
+        "deposit_horizon_preference",
+        "max_order_size",
+        "patience_discount",
+        "patience_premium",
+        "_optimism_delta",
+        "optimism",
+        "belief",
+        "perceived_pnl",
+        "initial_capital",
+        "current_intention",
+        "active_deposits",
+        "_deposit_maturities",
+        "pending_orders",
+        "_updates_since_sweep",
+        "last_known_price",
+        "_intent_counter"
+    )
+    
     #Belief Parameters
     initial_optimism: float
     stubbornness: float
@@ -35,6 +65,8 @@ class ValueInvestor(Agent):
     patience_discount: float
     patience_premium: float
     
+    _optimism_delta: float #Optimism step per PnL update, belief_update_rate * (1 - stubbornness)
+    
     #Belief State
     optimism: float
     belief: float
@@ -44,10 +76,12 @@ class ValueInvestor(Agent):
     
     #Tracking
     active_deposits: Dict[int, DepositView]
+    _deposit_maturities: List[Tuple[int, int]] #Min-heap of (maturity_macro_tick, deposit_id)
     pending_orders: Dict[int, OrderView]
+    _updates_since_sweep: int
     last_known_price: Optional[float]
     
-    __intent_id: int
+    _intent_counter: Iterator[int]
     
     
     def __init__(
@@ -82,6 +116,8 @@ class ValueInvestor(Agent):
         self.patience_discount = patience_discount
         self.patience_premium = patience_premium
         
+        self._optimism_delta = belief_update_rate * (1 - stubbornness)
+        
         self.optimism = initial_optimism
         self.belief = 100.0  
         self.perceived_pnl = 0.0
@@ -89,58 +125,64 @@ class ValueInvestor(Agent):
         self.current_intention = Intention.WAIT
         
         self.active_deposits = {}
+        self._deposit_maturities = []
         self.pending_orders = {}
+        self._updates_since_sweep = 0
         self.last_known_price = None
         
-        self.__intent_id = 0
-    
+        self._intent_counter = itertools.count()
     
-    @property
-    def intent_id(self) -> int:
-        intent_id = self.__intent_id
-        self.__intent_id += 1
-        return intent_id
     
-    
-    def decide(self, view: AgentView) -> List[AgentIntent]:
+    def decide(self, view: AgentView) -> Sequence[AgentIntent]:
         #BDI decision loop
         # -Update beliefs
         # -Select intention
         # -Execute intention
 
+        economy = view.economy_insight_view
         assert view.agent_id == self.agent_id
-        assert view.economy_insight_view is not None
+        assert economy is not None
+
+        self._cleanup_matured_deposits(view.macro_tick)
+
+        # Estimated once, every step reads the same tick snapshot
+        market_price = self._estimate_market_price(view)
+        deposit_opportunity = self._evaluate_deposit_opportunity(economy)
 
         # BDI Loop
-        self._update_beliefs(view)
-        self._select_intention(view)
-        return self._execute_intention(view)
+        self._update_beliefs(view, economy, market_price)
+        self._select_intention(market_price, deposit_opportunity)
+        return self._execute_intention(view, market_price, deposit_opportunity)
     
     
     def update(self, feedback: AgentFeedback) -> None:
         for _, deposit_view in feedback.deposit_results.items():
             if deposit_view is not None:
                 self.active_deposits[deposit_view.deposit_id] = deposit_view
+                heapq.heappush(self._deposit_maturities, (deposit_view.maturity_macro_tick, deposit_view.deposit_id))
         
         for _, order_view in feedback.order_results.items():
-            if order_view is not None:
+            # Orders that completed while being placed are never tracked
+            if order_view is not None and order_view.lifecycle != OrderLifecycle.DONE:
                 self.pending_orders[order_view.order_id] = order_view
         
+        # Resting orders complete through other agents' fills or expiry,
+        # which send no feedback, so they are swept periodically
+        self._updates_since_sweep += 1
+        if self._updates_since_sweep >= self.ORDER_SWEEP_INTERVAL:
+            self._updates_since_sweep = 0
+            self._cleanup_done_orders()
         
-    def _update_beliefs(self, view: AgentView) -> None:
+        
+    def _update_beliefs(self, view: AgentView, economy: EconomyInsightView, market_price: Optional[float]) -> None:
         # -Calculate belief from optimism and TV interval
         # -Update optimism based on performance (with stubbornness friction)
         # -Update perceived PnL
        
-        economy = view.economy_insight_view
-        assert economy is not None
-        
-        TV_low, TV_high = economy.tv_interval
-        
-        self.belief = TV_low + self.optimism * (TV_high - TV_low)
+        self.belief = economy.tv_low + self.optimism * economy.tv_width
         
         self._update_optimism(view)
-        self._update_perceived_pnl(view)
+        self._update_perceived_pnl(market_price)
     
     
     def _update_optimism(self, view: AgentView) -> None:
@@ -149,19 +191,16 @@ class ValueInvestor(Agent):
         
         if self.perceived_pnl > 0:
             # Success → increase optimism
-            delta = self.belief_update_rate * (1 - self.stubbornness)
-            self.optimism = min(1.0, self.optimism + delta)
+            self.optimism = min(1.0, self.optimism + self._optimism_delta)
         elif self.perceived_pnl < 0:
             # Loss → decrease optimism 
-            delta = self.belief_update_rate * (1 - self.stubbornness)
-            self.optimism = max(0.0, self.optimism - delta)
+            self.optimism = max(0.0, self.optimism - self._optimism_delta)
     
     
-    def _update_perceived_pnl(self, view: AgentView) -> None:
+    def _update_perceived_pnl(self, market_price: Optional[float]) -> None:
         cash = self.account_view.cash
         shares = self.account_view.shares
         
-        market_price = self._estimate_market_price(view)
         if market_price is None:
             market_price = self.belief
         
@@ -170,12 +209,11 @@ class ValueInvestor(Agent):
         self.perceived_pnl = portfolio_value - self.initial_capital
     
     
-    def _calculate_mispricing(self, view: AgentView) -> float:
+    def _calculate_mispricing(self, market_price: Optional[float]) -> float:
         #(belief - market_price) / belief
         #Positive: Market undervalued (BUY signal)
         #Negative: Market overvalued (SELL signal)
        
-        market_price = self._estimate_market_price(view)
         if market_price is None or market_price <= 0:
             return 0.0
         
@@ -184,24 +222,24 @@ class ValueInvestor(Agent):
     
     
     def _calculate_position_fraction(self) -> float:
-        cash = self.account_view.cash
-        shares = self.account_view.shares
-        
-        if self.last_known_price is None:
+        last_known_price = self.last_known_price
+        if last_known_price is None:
             return 0.0
         
-        total_capital = cash + shares * self.last_known_price
+        account_view = self.account_view
+        cash = account_view.cash
+        shares = account_view.shares
+        
+        total_capital = cash + shares * last_known_price
         
         if total_capital <= 0:
             return 0.0
         
-        position_value = shares * self.last_known_price
+        position_value = shares * last_known_price
         return position_value / total_capital
     
     
-    def _evaluate_deposit_opportunity(self, view: AgentView) -> Optional[Tuple[int, float]]:
-        economy = view.economy_insight_view
-        assert economy is not None
+    def _evaluate_deposit_opportunity(self, economy: EconomyInsightView) -> Optional[Tuple[int, float]]:
         deposit_rates = economy.deposit_rates
         
         if not deposit_rates:
@@ -210,10 +248,11 @@ class ValueInvestor(Agent):
         best_term = None
         best_score = -float('inf')
         
-        max_term = max(deposit_rates.keys())
+        max_term = economy.max_deposit_term
+        horizon_weight = 1 - self.deposit_horizon_preference
         
         for term, rate in deposit_rates.items():
-            horizon_penalty = (1 - self.deposit_horizon_preference) * (term / max_term)
+            horizon_penalty = horizon_weight * (term / max_term)
             score = rate - horizon_penalty
             
             if score > best_score:
@@ -229,10 +268,9 @@ class ValueInvestor(Agent):
         return None
 
     
-    def _select_intention(self, view: AgentView) -> None:
-        mispricing = self._calculate_mispricing(view)
+    def _select_intention(self, market_price: Optional[float], deposit_opportunity: Optional[Tuple[int, float]]) -> None:
+        mispricing = self._calculate_mispricing(market_price)
         position_fraction = self._calculate_position_fraction()
-        deposit_opportunity = self._evaluate_deposit_opportunity(view)
         
         # Prio1: ACCUMULATE 
         if mispricing > self.mispricing_threshold:
@@ -248,9 +286,11 @@ class ValueInvestor(Agent):
         
         # Prio3: PARK_CAPITAL
         if deposit_opportunity is not None:
-            cash = self.account_view.cash
-            if self.last_known_price is not None:
-                total_wealth = cash + self.account_view.shares * self.last_known_price
+            account_view = self.account_view
+            cash = account_view.cash
+            last_known_price = self.last_known_price
+            if last_known_price is not None:
+                total_wealth = cash + account_view.shares * last_known_price
                 if total_wealth > 0 and cash / total_wealth > 0.2:
                     self.current_intention = Intention.PARK_CAPITAL
                     return
@@ -258,44 +298,48 @@ class ValueInvestor(Agent):
         self.current_intention = Intention.WAIT
     
     
-    def _execute_intention(self, view: AgentView) -> List[AgentIntent]:
+    def _execute_intention(
+        self,
+        view: AgentView,
+        market_price: Optional[float],
+        deposit_opportunity: Optional[Tuple[int, float]]
+    ) -> Sequence[AgentIntent]:
         if self.current_intention == Intention.WAIT:
             return self._execute_wait(view)
         elif self.current_intention == Intention.ACCUMULATE:
-            return self._execute_accumulate(view)
+            return self._execute_accumulate(market_price)
         elif self.current_intention == Intention.DISTRIBUTE:
-            return self._execute_distribute(view)
+            return self._execute_distribute(market_price)
         elif self.current_intention == Intention.PARK_CAPITAL:
-            return self._execute_park_capital(view)
+            return self._execute_park_capital(deposit_opportunity)
         else:
-            return []
+            return _NO_INTENTS
 
         
-    def _execute_wait(self, view: AgentView) -> List[AgentIntent]:
+    def _execute_wait(self, view: AgentView) -> Sequence[AgentIntent]:
         _ = view
-        return []
+        return _NO_INTENTS
     
     
-    def _execute_accumulate(self, view: AgentView) -> List[AgentIntent]:
+    def _execute_accumulate(self, market_price: Optional[float]) -> Sequence[AgentIntent]:
         cash = self.account_view.cash
         if cash <= 0:
-            return []
+            return _NO_INTENTS
         
-        market_price = self._estimate_market_price(view)
         if market_price is None:
-            return []
+            return _NO_INTENTS
         
-        shares_affordable = int(cash / (market_price * (1 + self.constants.fee_rate)))
+        shares_affordable = int(cash / (market_price * self._fee_multiplier))
         quantity = min(shares_affordable, self.max_order_size)
         
         if quantity <= 0:
-            return []
+            return _NO_INTENTS
         
         buy_price = market_price * (1 - self.patience_discount)
         
         return [
             PlaceOrderIntent(
-                intent_id=self.intent_id,
+                intent_id=next(self._intent_counter),
                 side=Side.BUY,
                 order_type=OrderType.LIMIT,
                 quantity=quantity,
@@ -304,14 +348,13 @@ class ValueInvestor(Agent):
         ]
     
     
-    def _execute_distribute(self, view: AgentView) -> List[AgentIntent]:
+    def _execute_distribute(self, market_price: Optional[float]) -> Sequence[AgentIntent]:
         shares = self.account_view.shares
         if shares <= 0:
-            return []
+            return _NO_INTENTS
         
-        market_price = self._estimate_market_price(view)
         if market_price is None:
-            return []
+            return _NO_INTENTS
         
         quantity = min(shares, self.max_order_size)
         
@@ -319,7 +362,7 @@ class ValueInvestor(Agent):
         
         return [
             PlaceOrderIntent(
-                intent_id=self.intent_id,
+                intent_id=next(self._intent_counter),
                 side=Side.SELL,
                 order_type=OrderType.LIMIT,
                 quantity=quantity,
@@ -328,25 +371,24 @@ class ValueInvestor(Agent):
         ]
     
     
-    def _execute_park_capital(self, view: AgentView) -> List[AgentIntent]:
+    def _execute_park_capital(self, deposit_opp: Optional[Tuple[int, float]]) -> Sequence[AgentIntent]:
         cash = self.account_view.cash
         if cash <= 0:
-            return []
+            return _NO_INTENTS
         
-        deposit_opp = self._evaluate_deposit_opportunity(view)
         if deposit_opp is None:
-            return []
+            return _NO_INTENTS
         
         term, _ = deposit_opp
         
         deposit_amount = cash * self.deposit_allocation_fraction
         
         if deposit_amount <= 0:
-            return []
+            return _NO_INTENTS
         
         return [
             CreateDepositIntent(
-                intent_id=self.intent_id,
+                intent_id=next(self._intent_counter),
                 amount=deposit_amount,
                 term=term
             )
@@ -369,12 +411,14 @@ class ValueInvestor(Agent):
     
     
     def _cleanup_matured_deposits(self, current_macro_tick: int) -> None:
-        for deposit_id, deposit_view in list(self.active_deposits.items()):
-            if current_macro_tick >= deposit_view.maturity_macro_tick:
-                del self.active_deposits[deposit_id]
+        # Only the matured front of the heap is touched
+        maturities = self._deposit_maturities
+        while maturities and maturities[0][0] <= current_macro_tick:
+            _, deposit_id = heapq.heappop(maturities)
+            self.active_deposits.pop(deposit_id, None)
     
     
     def _cleanup_done_orders(self) -> None:
-        for order_id, order_view in list(self.pending_orders.items()):
-            if order_view.lifecycle == OrderLifecycle.DONE:
-                del self.pending_orders[order_id]
+        done_ids = [order_id for order_id, order_view in self.pending_orders.items() if order_view.lifecycle == OrderLifecycle.DONE]
+        for order_id in done_ids:
+            del self.pending_orders[order_id]
@@ -4,6 +4,6 @@ from dataclasses import dataclass
 
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class AgentIntent(ABC):
     intent_id:int
@@ -5,6 +5,6 @@ from .agent_intent import AgentIntent
 
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CancelOrderIntent(AgentIntent):
     order_id:int
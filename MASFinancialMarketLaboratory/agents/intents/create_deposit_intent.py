@@ -5,7 +5,7 @@ from .agent_intent import AgentIntent
 
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CreateDepositIntent(AgentIntent):
     amount:float
     term:int
@@ -8,7 +8,7 @@ from environment.models.order import OrderType, Side
 
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PlaceOrderIntent(AgentIntent):
     side:Side
     order_type:OrderType
@@ -3,7 +3,7 @@ from dataclasses import dataclass
 
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class AgentConstants:
     simulation_macro_tick:int
     simulation_micro_tick:int
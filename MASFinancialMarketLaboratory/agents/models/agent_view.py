@@ -6,7 +6,7 @@ from environment.views import MarketDataView, EconomyInsightView
 
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class AgentView:
     agent_id:int
 
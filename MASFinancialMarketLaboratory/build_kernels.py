@@ -0,0 +1,73 @@
+import sys
+import time
+
+import numpy as np
+
+from agents.agents._njit import NUMBA_AVAILABLE
+from agents.agents import market_maker_kernels as mm_kernels
+from agents.agents import momentum_kernels
+
+
+#Compiles every numba kernel for the argument types the simulation calls it with.
+#Kernels are declared with cache=True, so the machine code lands in __pycache__
+#and later runs load it instead of JIT compiling on their first tick.
+#Run once after installing or upgrading numba: python build_kernels.py
+
+
+def _warm_market_maker_kernels() -> None:
+    mm_kernels.skewed_quotes(100.0, 0.4, 0.5, 10, 1.0, 0.001)
+    mm_kernels.skewed_quantities(0.4, 0.5, 10)
+    mm_kernels.provide_quotes(100.0, 1.0, 0.001)
+    mm_kernels.panic_sell_order(100.0, 10.0, 50, 30)
+    mm_kernels.panic_buy_order(100.0, 10.0, 1000.0, 1.001, 30)
+    mm_kernels.affordable_quantity(10, 1000.0, 100.0, 0.001)
+    mm_kernels.validated_quantities(10, 10, 1000.0, 50, 100.0, 0.001)
+    mm_kernels.stabilize_quantities(0.4, 0.5, 10, 1000.0, 50, 100.0, 0.001)
+    mm_kernels.quote_drift_exceeded(100.5, 100.0, 2)
+
+    # MarketMakerBatch, float64 and float32 ratio columns
+    for ratio_dtype in (np.float64, np.float32):
+        lanes = 4
+        mid_price = np.full(lanes, 100.0)
+        ratio = np.full(lanes, 0.4, dtype=ratio_dtype)
+        stabilize = np.array([True, False] * (lanes // 2))
+        mm_kernels.batch_quotes(
+            mid_price,
+            ratio,
+            stabilize,
+            np.full(lanes, 0.5, dtype=ratio_dtype),
+            np.full(lanes, 10.0, dtype=ratio_dtype),
+            np.full(lanes, 1.0),
+            np.full(lanes, 0.001),
+            np.full(lanes, np.nan),
+            np.full(lanes, np.nan)
+        )
+
+
+def _warm_momentum_kernels() -> None:
+    momentum_kernels.weighted_momentum(np.linspace(100.0, 101.0, 8))
+
+    # MomentumTraderBatch rows, the window is a strided view into the mirrored ring
+    prices = np.tile(np.linspace(100.0, 101.0, 16), (4, 1))[:, 4:12]
+    count = np.full(4, 6, dtype=np.int64)
+    momentum = np.empty(4)
+    momentum_kernels.lane_momentum(prices, count, momentum)
+    momentum_kernels.lane_momentum_parallel(prices, count, momentum)
+
+
+def main():
+    if not NUMBA_AVAILABLE:
+        print("numba is not installed, kernels run as plain Python.")
+        sys.exit(0)
+
+    start = time.time()
+    _warm_market_maker_kernels()
+    print(f"Market maker kernels compiled and cached in {time.time() - start:.2f}s")
+
+    start = time.time()
+    _warm_momentum_kernels()
+    print(f"Momentum kernels compiled and cached in {time.time() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
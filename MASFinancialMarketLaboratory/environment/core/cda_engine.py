@@ -415,7 +415,8 @@ class CDAEngine:
             return 
             
         if insufficient_market_depth or non_crossing:
-            assert self.order_book.add_order(order)
+            added = self.order_book.add_order(order)
+            assert added
             return
 
         order.lifecycle = OrderLifecycle.DONE
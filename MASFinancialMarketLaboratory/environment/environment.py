@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Optional
+from typing import List, Optional, Sequence, Tuple
 import time
 
 from environment.configs import get_environment_configuration
@@ -55,7 +55,9 @@ class Environment:
             initial_shares=initial_shares
         )
 
-        assert self.storage_ledger.add_account(account)
+        added = self.storage_ledger.add_account(account)
+
+        assert added
 
         return account.create_view()
         
@@ -71,6 +73,30 @@ class Environment:
         if not self.settlement_ledger.is_account_exist(agent_id):
             return
 
+        return self.__submit_order(agent_id, order_type, side, quantity, price)
+
+
+    def create_orders(
+            self,
+            agent_id:int,
+            orders:Sequence[Tuple[OrderType, Side, int, Optional[float]]]
+    ) -> List[Optional[OrderView]]:
+        #Bulk create_order for one agent, (order_type, side, quantity, price) processed in sequence order
+        if not self.settlement_ledger.is_account_exist(agent_id):
+            return [None] * len(orders)
+
+        return [self.__submit_order(agent_id, *order) for order in orders]
+
+
+    def __submit_order(
+            self,
+            agent_id:int,
+            order_type:OrderType,
+            side:Side,
+            quantity:int,
+            price:Optional[float]
+    ) -> Optional[OrderView]:
+        #create_order after the account check
         if not quantity > 0:
             return
 
@@ -100,7 +126,9 @@ class Environment:
             end_reason=OrderEndReasons.NONE
         )
 
-        assert self.storage_ledger.add_order(order)
+        added = self.storage_ledger.add_order(order)
+
+        assert added
         
         self.cda_engine.process_new_order(order)
         
@@ -110,6 +138,19 @@ class Environment:
     def cancel_order(self, agent_id:int, order_id:int) -> None:
         if not self.settlement_ledger.is_account_exist(agent_id): return
 
+        self.__cancel_order(agent_id, order_id)
+
+
+    def cancel_orders(self, agent_id:int, order_ids:Sequence[int]) -> None:
+        #Bulk cancel_order for one agent, processed in sequence order
+        if not self.settlement_ledger.is_account_exist(agent_id): return
+
+        for order_id in order_ids:
+            self.__cancel_order(agent_id, order_id)
+
+
+    def __cancel_order(self, agent_id:int, order_id:int) -> None:
+        #cancel_order after the account check
         order = self.storage_ledger.get_order(order_id)
         if order is None: return
         if order.agent_id != agent_id: return
@@ -133,6 +174,28 @@ class Environment:
         if not self.settlement_ledger.is_account_exist(agent_id):
             return
 
+        return self.__open_deposit(agent_id, term, deposited_cash)
+
+
+    def create_deposits(
+            self,
+            agent_id:int,
+            deposits:Sequence[Tuple[int, float]]
+    ) -> List[Optional[DepositView]]:
+        #Bulk create_deposit for one agent, (term, deposited_cash) processed in sequence order
+        if not self.settlement_ledger.is_account_exist(agent_id):
+            return [None] * len(deposits)
+
+        return [self.__open_deposit(agent_id, term, deposited_cash) for term, deposited_cash in deposits]
+
+
+    def __open_deposit(
+            self,
+            agent_id:int,
+            term:int,
+            deposited_cash:float
+    ) -> Optional[DepositView]:
+        #create_deposit after the account check
         SIM_CONFIG = get_simulation_configurations()
         ENV_CONFIG = get_environment_configuration()
         if not term in ENV_CONFIG.ECONOMY_SCENARIO.deposit_terms:
@@ -153,7 +216,9 @@ class Environment:
 
         if deposit is None: return
 
-        assert self.storage_ledger.add_deposit(deposit)
+        added = self.storage_ledger.add_deposit(deposit)
+
+        assert added
 
         return deposit.create_view()
 
@@ -161,7 +226,9 @@ class Environment:
     def get_economy_insight(self) -> EconomyInsightView:
         economy_insight = self.economy_module.get_economy_insight()
 
-        assert self.storage_ledger.add_economy_insight(economy_insight)
+        added = self.storage_ledger.add_economy_insight(economy_insight)
+
+        assert added
 
         return economy_insight.create_view()
         
@@ -169,6 +236,8 @@ class Environment:
     def get_market_data(self) -> MarketDataView:
         market_data = self.cda_engine.get_market_data()
 
-        assert self.storage_ledger.add_market_data(market_data)
+        added = self.storage_ledger.add_market_data(market_data)
+
+        assert added
         
         return market_data.create_view()
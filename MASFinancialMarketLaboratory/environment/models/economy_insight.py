@@ -23,8 +23,14 @@ class EconomyInsight:
     def create_view(self) -> EconomyInsightView:
         ENV_CONFIG = get_environment_configuration()
         
+        tv_low = self.tv_interval[0] / ENV_CONFIG.PRICE_SCALE
+        tv_high = self.tv_interval[1] / ENV_CONFIG.PRICE_SCALE
+        
         return EconomyInsightView(
             macro_tick=self.macro_tick,
-            tv_interval=(self.tv_interval[0] / ENV_CONFIG.PRICE_SCALE, self.tv_interval[1] / ENV_CONFIG.PRICE_SCALE),
-            deposit_rates=self.deposit_rates
+            tv_interval=(tv_low, tv_high),
+            deposit_rates=self.deposit_rates,
+            tv_low=tv_low,
+            tv_width=tv_high - tv_low,
+            max_deposit_term=max(self.deposit_rates.keys(), default=0)
         )
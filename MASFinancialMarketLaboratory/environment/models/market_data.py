@@ -79,6 +79,12 @@ class MarketData:
         vwap_micro = None
         if self.vwap_micro is not None:
             vwap_micro = self.vwap_micro / ENV_CONFIG.PRICE_SCALE
+
+        estimated_mid = mid_price
+        if estimated_mid is None:
+            estimated_mid = micro_price
+        if estimated_mid is None:
+            estimated_mid = last_traded_price
             
             
         return MarketDataView(
@@ -101,5 +107,6 @@ class MarketData:
             asks_depth_N=self.asks_depth_N,
             imbalance_N=self.imbalance_N,
             vwap_macro=vwap_macro,
-            vwap_micro=vwap_micro
+            vwap_micro=vwap_micro,
+            estimated_mid=estimated_mid
         )
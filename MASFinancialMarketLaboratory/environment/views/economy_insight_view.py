@@ -11,3 +11,8 @@ class EconomyInsightView:
     tv_interval:Tuple[float, float]
     deposit_rates:Dict[int, float] #((term-rate), ...)
     
+    #Derived once per macro tick, shared by every reader
+    tv_low:float #tv_interval[0]
+    tv_width:float #tv_interval[1] - tv_interval[0]
+    max_deposit_term:int #max(deposit_rates), 0 without deposit terms
+    
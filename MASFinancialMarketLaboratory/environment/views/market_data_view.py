@@ -32,3 +32,5 @@ class MarketDataView:
     imbalance_N:Optional[float]
     vwap_macro:Optional[float]
     vwap_micro:Optional[float]
+
+    estimated_mid:Optional[float] #mid_price -> micro_price -> last_traded_price, resolved once per snapshot
@@ -1,6 +1,5 @@
 import sys
 from pathlib import Path
-import time
 
 from environment import Environment
 from simulation.core import SimulationEngine, SimulationInitializer
@@ -26,48 +25,24 @@ def main():
     
     print("Loading Configurations...", end="", flush=True)
     SimulationInitializer.INITIALIZE_CONFIGS(str(config_file.absolute()))
-    time.sleep(2)
     print("\b\b\b - Completed ✔️")
     print()
     
     print("Creating Environment...", end="", flush=True)
     env = Environment()
-    time.sleep(2)
     print("\b\b\b - Completed ✔️")
     print()    
 
     print("Creating Simulation Engine...")
-    time.sleep(2)
-    engine = SimulationEngine(env)
-    sys.stdout.write("\033[s")
-    sys.stdout.write("\033[F")
-    sys.stdout.write("\033[F")
-    sys.stdout.write("\033[F")
-    sys.stdout.write("\033[F")
-    sys.stdout.write("\033[F")
-    sys.stdout.write("\033[F")
-    sys.stdout.write("\033[F")
-    time.sleep(1)
+    engine = SimulationEngine(env, verbose=True)
     print("Creating Simulation Engine - Completed ✔️")
-    sys.stdout.write("\033[u")
     print()
     
     print("=" * 75)
-    print("Simulation Starting...")
+    print("Simulation Running...")
     print("=" * 75)
-    time.sleep(3)
-    sys.stdout.write("\033[s")
-    sys.stdout.write("\033[F")
-    print(" " * 75)
-    sys.stdout.write("\033[F")
-    sys.stdout.write("\033[F")
-    print("\rSimulation Running...", flush=True)
-    sys.stdout.write("\033[u")
-    print("=" * 75)
-    sys.stdout.write("\033[F")
-    sys.stdout.write("\033[F")
     engine.run()
-    sys.stdout.write("\033[F")
+    print()
     print("Simulation Complete ✅")
     print("=" * 75)
 
@@ -1,5 +1,7 @@
 from __future__ import annotations
-from typing import Dict, Optional
+from dataclasses import dataclass
+import math
+from typing import Any, Dict, Optional
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -44,15 +46,117 @@ class SimulationAgentConfiguration(BaseSettings):
 
     model_config = SettingsConfigDict(frozen=True)
 
+
+#Slotted mirrors of the models above. Pydantic validates the JSON once, the
+#simulation then reads these plain attributes (distribution extras would
+#otherwise go through BaseModel.__getattr__ on every read).
+
+@dataclass(frozen=True, slots=True)
+class FrozenDistributionConfig:
+    distribution: str
+    value: Any = None #constant
+    min: Any = None #uniform
+    max: Any = None #uniform
+    values: Any = None #discrete_uniform
+    mean: Any = None #lognormal
+    std: Any = None #lognormal
+    mu: Optional[float] = None #lognormal, log(mean) resolved once at load
+
+
+    @classmethod
+    def from_model(cls, model: DistributionConfig) -> FrozenDistributionConfig:
+        mean = getattr(model, "mean", None)
+        
+        return cls(
+            distribution=model.distribution,
+            value=getattr(model, "value", None),
+            min=getattr(model, "min", None),
+            max=getattr(model, "max", None),
+            values=getattr(model, "values", None),
+            mean=mean,
+            std=getattr(model, "std", None),
+            mu=math.log(mean) if model.distribution == "lognormal" else None
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class FrozenInitialEndowment:
+    cash: FrozenDistributionConfig
+    shares: FrozenDistributionConfig
+
+
+    @classmethod
+    def from_model(cls, model: InitialEndowment) -> FrozenInitialEndowment:
+        return cls(
+            cash=FrozenDistributionConfig.from_model(model.cash),
+            shares=FrozenDistributionConfig.from_model(model.shares)
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class FrozenInitialEndowments:
+    market_maker: FrozenInitialEndowment
+    others: FrozenInitialEndowment
+
+
+    @classmethod
+    def from_model(cls, model: InitialEndowments) -> FrozenInitialEndowments:
+        return cls(
+            market_maker=FrozenInitialEndowment.from_model(model.market_maker),
+            others=FrozenInitialEndowment.from_model(model.others)
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class FrozenAgentGroup:
+    count: int
+    parameters: Dict[str, FrozenDistributionConfig]
+
+
+    @classmethod
+    def from_model(cls, model: AgentGroup) -> FrozenAgentGroup:
+        return cls(
+            count=model.count,
+            parameters={name: FrozenDistributionConfig.from_model(dist) for name, dist in model.parameters.items()}
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class FrozenGlobalConfig:
+    random_seed: int
+
+
+@dataclass(frozen=True, slots=True)
+class FrozenSimulationAgentConfiguration:
+    global_config: FrozenGlobalConfig
+    initial_endowment: FrozenInitialEndowments
+
+    market_maker: FrozenAgentGroup
+    value_investor: FrozenAgentGroup
+    momentum_trader: FrozenAgentGroup
+    noise_trader: FrozenAgentGroup
+
+
+    @classmethod
+    def from_settings(cls, settings: SimulationAgentConfiguration) -> FrozenSimulationAgentConfiguration:
+        return cls(
+            global_config=FrozenGlobalConfig(random_seed=settings.global_config.random_seed),
+            initial_endowment=FrozenInitialEndowments.from_model(settings.initial_endowment),
+            market_maker=FrozenAgentGroup.from_model(settings.market_maker),
+            value_investor=FrozenAgentGroup.from_model(settings.value_investor),
+            momentum_trader=FrozenAgentGroup.from_model(settings.momentum_trader),
+            noise_trader=FrozenAgentGroup.from_model(settings.noise_trader)
+        )
+
     
-__SIMULATION_AGENT_CONFIGURATION: Optional[SimulationAgentConfiguration] = None
+__SIMULATION_AGENT_CONFIGURATION: Optional[FrozenSimulationAgentConfiguration] = None
 
 
-def set_simulation_agent_configuration(config: SimulationAgentConfiguration) -> None:
+def set_simulation_agent_configuration(config: FrozenSimulationAgentConfiguration) -> None:
     global __SIMULATION_AGENT_CONFIGURATION
     __SIMULATION_AGENT_CONFIGURATION = config
 
     
-def get_simulation_agent_configuration() -> SimulationAgentConfiguration:
+def get_simulation_agent_configuration() -> FrozenSimulationAgentConfiguration:
     assert __SIMULATION_AGENT_CONFIGURATION is not None
     return __SIMULATION_AGENT_CONFIGURATION
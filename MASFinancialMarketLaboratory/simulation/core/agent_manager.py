@@ -1,62 +1,185 @@
 from __future__ import annotations
-from typing import Dict, Any, List, Callable, Optional, Tuple
+from typing import Dict, Any, List, Callable, Optional, Sequence, Tuple
+from dataclasses import dataclass
 import random
-import math
-import time
+
+import numpy as np
 
 from environment.views import AccountView
 from environment.configs import get_environment_configuration
-from agents import Agent, MarketMaker, ValueInvestor, MomentumTrader, NoiseTrader
-from agents.models import AgentConstants
+from agents import Agent, MarketMaker, ValueInvestor, MomentumTrader, MomentumTraderBatch, NoiseTrader
+from agents.models import AgentConstants, AgentView, AgentFeedback
+from agents.intents import AgentIntent
 
 from simulation.configs import get_simulation_configurations
-from simulation.configs.simulation_agent_configuration import get_simulation_agent_configuration, DistributionConfig
+from simulation.configs.simulation_agent_configuration import get_simulation_agent_configuration, FrozenDistributionConfig, FrozenInitialEndowment
+
+
+
+#Distribution name -> (generator, config, count) -> count draws as Python scalars
+_COLUMN_SAMPLERS: Dict[str, Callable[[np.random.Generator, FrozenDistributionConfig, int], List[Any]]] = {
+    "constant": lambda gen, c, n: [c.value] * n,
+    "uniform": lambda gen, c, n: gen.uniform(c.min, c.max, n).tolist(),
+    "discrete_uniform": lambda gen, c, n: gen.choice(c.values, n).tolist(),
+    "lognormal": lambda gen, c, n: gen.lognormal(c.mu, c.std, n).tolist()
+}
+
+
+def _build_market_maker(agent_id: int, account_view: AccountView, constants: AgentConstants, params: Dict[str, Any], seed: Optional[int]) -> Agent:
+    _ = seed
+    return MarketMaker(
+        agent_id=agent_id,
+        account_view=account_view,
+        constants=constants,
+        target_inventory_fraction=float(params["target_inventory_fraction"]),
+        risk_lower_bound=float(params["risk_lower_bound"]),
+        risk_upper_bound=float(params["risk_upper_bound"]),
+        stabilization_tolerance=float(params["stabilization_tolerance"]),
+        spread_size=int(params["spread_size"]),
+        order_size=int(params["order_size"]),
+        wait_time=int(params["wait_time"]),
+        skew_factor=int(params["skew_factor"])
+    )
+
+
+def _build_value_investor(agent_id: int, account_view: AccountView, constants: AgentConstants, params: Dict[str, Any], seed: Optional[int]) -> Agent:
+    _ = seed
+    return ValueInvestor(
+        agent_id=agent_id,
+        account_view=account_view,
+        constants=constants,
+        initial_optimism=float(params["initial_optimism"]),
+        stubbornness=float(params["stubbornness"]),
+        belief_update_rate=float(params["belief_update_rate"]),
+        mispricing_threshold=float(params["mispricing_threshold"]),
+        max_position_fraction=float(params["max_position_fraction"]),
+        deposit_affinity=float(params["deposit_affinity"]),
+        deposit_allocation_fraction=float(params["deposit_allocation_fraction"]),
+        deposit_horizon_preference=float(params["deposit_horizon_preference"]),
+        max_order_size=int(params["max_order_size"]),
+        patience_discount=float(params["patience_discount"]),
+        patience_premium=float(params["patience_premium"])
+    )
+
+
+def _build_momentum_trader(agent_id: int, account_view: AccountView, constants: AgentConstants, params: Dict[str, Any], seed: Optional[int]) -> Agent:
+    _ = seed
+    return MomentumTrader(
+        agent_id=agent_id,
+        account_view=account_view,
+        constants=constants,
+        momentum_window=int(params["momentum_window"]),
+        entry_threshold=float(params["entry_threshold"]),
+        exit_threshold=float(params["exit_threshold"]),
+        aggressiveness=float(params["aggressiveness"]),
+        max_exposure_fraction=float(params["max_exposure_fraction"]),
+        directional_bias=float(params["directional_bias"]),
+        liquidity_baseline=int(params["liquidity_baseline"])
+    )
+
+
+def _build_noise_trader(agent_id: int, account_view: AccountView, constants: AgentConstants, params: Dict[str, Any], seed: Optional[int]) -> Agent:
+    return NoiseTrader(
+        agent_id=agent_id,
+        account_view=account_view,
+        constants=constants,
+        rng=random.Random(seed),
+        p_trade=float(params["p_trade"]),
+        p_buy=float(params["p_buy"]),
+        p_market_order=float(params["p_market_order"]),
+        min_quantity=int(params["min_quantity"]),
+        max_quantity=int(params["max_quantity"]),
+        price_offset_ticks=int(params["price_offset_ticks"])
+    )
+
+
+@dataclass(frozen=True)
+class _AgentGroupSpec:
+    first_agent_id: int
+    group_key: str #Attribute of the agent configuration
+    endowment_key: str #Attribute of its initial_endowment
+    registry: str #AgentManager dict the agents are stored in
+    build: Callable[[int, AccountView, AgentConstants, Dict[str, Any], Optional[int]], Agent]
+    seeded: bool = False #Draw a per-agent random.Random seed
+
+
+#Initialization order, also the order agents are registered in
+_GROUP_SPECS: Tuple[_AgentGroupSpec, ...] = (
+    _AgentGroupSpec(10000, "market_maker", "market_maker", "market_makers", _build_market_maker),
+    _AgentGroupSpec(20000, "value_investor", "others", "value_investors", _build_value_investor),
+    _AgentGroupSpec(30000, "momentum_trader", "others", "momentum_traders", _build_momentum_trader),
+    _AgentGroupSpec(40000, "noise_trader", "others", "noise_traders", _build_noise_trader, seeded=True)
+)
 
 
+#(agent_id, agent, decide, update, needs_economy, may_deposit) with the bound methods and role flags resolved once
+AgentEntry = Tuple[int, Agent, Callable[[AgentView], Sequence[AgentIntent]], Callable[[AgentFeedback], None], bool, bool]
+
 
 class AgentManager:
     register_agent_callback:Callable[[int, float, int], Optional[AccountView]]
+    verbose:bool
     
-    rng:random.Random
+    np_rng:np.random.Generator #Endowment, parameter and NoiseTrader seed draws, then the per-tick agent order
     
-    agents: Dict[int, Agent]
+    agents: List[Agent] #Registration order, the role dicts below are keyed by agent_id
     market_makers: Dict[int, MarketMaker]
     value_investors: Dict[int, ValueInvestor]
     momentum_traders: Dict[int, MomentumTrader]
+    momentum_batch: MomentumTraderBatch
     noise_traders: Dict[int, NoiseTrader]
     
+    _agent_constants: AgentConstants #Immutable, shared by every agent
+    
+    _macro_entries: List[AgentEntry]
+    _micro_entries: List[AgentEntry] #ValueInvestors only act on macro ticks
+    _macro_schedule: List[AgentEntry] #Reused shuffled copies handed out per tick
+    _micro_schedule: List[AgentEntry]
+    
     
     def __init__(
         self, 
-        register_agent_callback: Callable[[int, float, int], Optional[AccountView]]
+        register_agent_callback: Callable[[int, float, int], Optional[AccountView]],
+        verbose: bool = False
     ) -> None:
         self.register_agent_callback = register_agent_callback
+        self.verbose = verbose
         
-        self.agents = {}
+        self.agents = []
         self.market_makers = {}
         self.value_investors = {}
         self.momentum_traders = {}
+        self.momentum_batch = MomentumTraderBatch([])
         self.noise_traders = {}
         
+        self._macro_entries = []
+        self._micro_entries = []
+        self._macro_schedule = []
+        self._micro_schedule = []
+        
         agent_config = get_simulation_agent_configuration()
-        self.rng = random.Random(agent_config.global_config.random_seed)
+        self.np_rng = np.random.default_rng(agent_config.global_config.random_seed)
+        self._agent_constants = self._get_agent_constants()
     
     
     def initialize_agents(self) -> None:
-        print("\tInitializing Agents...", end="", flush=True)
-        time.sleep(2)
-        self._initialize_market_makers()
-        self._initialize_value_investors()
-        self._initialize_momentum_traders()
-        self._initialize_noise_traders()
-        print("\b\b\b - Completed ✔️")
-        time.sleep(1)
-        
-        print(f"\t\tMarketMaker Agents Initialized: {len(self.market_makers)}")
-        print(f"\t\tValueInvestor Agents Initialized: {len(self.value_investors)}") 
-        print(f"\t\tMomentumTrader Agents Initialized: {len(self.momentum_traders)}")
-        print(f"\t\tNoiseTrader Agents Initialized: {len(self.noise_traders)}")
-        print(f"\t\tTotal Agents Initialized: {len(self.agents)}")
+        if self.verbose:
+            print("\tInitializing Agents...", end="", flush=True)
+        
+        for spec in _GROUP_SPECS:
+            self._initialize_group(spec)
+        
+        self.momentum_batch = MomentumTraderBatch(list(self.momentum_traders.values()))
+        self._build_agent_entries()
+        
+        if self.verbose:
+            print("\b\b\b - Completed ✔️")
+            
+            print(f"\t\tMarketMaker Agents Initialized: {len(self.market_makers)}")
+            print(f"\t\tValueInvestor Agents Initialized: {len(self.value_investors)}") 
+            print(f"\t\tMomentumTrader Agents Initialized: {len(self.momentum_traders)}")
+            print(f"\t\tNoiseTrader Agents Initialized: {len(self.noise_traders)}")
+            print(f"\t\tTotal Agents Initialized: {len(self.agents)}")
     
     
     def _get_agent_constants(self) -> AgentConstants:
@@ -70,184 +193,86 @@ class AgentManager:
         )
     
     
-    def _sample_value(self, dist_config: DistributionConfig) -> Any:
-        dist_type = dist_config.distribution
+    def _sample_column(self, dist_config: FrozenDistributionConfig, count: int) -> List[Any]:
+        #Draws the field for a whole group at once
         
-        if dist_type == "constant":
-            return getattr(dist_config, "value")
+        sampler = _COLUMN_SAMPLERS.get(dist_config.distribution)
+        if sampler is None:
+            raise ValueError(f"Unknown distribution type: {dist_config.distribution}")
         
-        elif dist_type == "uniform":
-            min_val = getattr(dist_config, "min")
-            max_val = getattr(dist_config, "max")
-            return self.rng.uniform(min_val, max_val)
-        
-        elif dist_type == "discrete_uniform":
-            values = getattr(dist_config, "values")
-            return self.rng.choice(values)
-        
-        elif dist_type == "lognormal":
-            mean = getattr(dist_config, "mean")
-            std = getattr(dist_config, "std")
-            return self.rng.lognormvariate(math.log(mean), std)
-        
-        raise ValueError(f"Unknown distribution type: {dist_type}")
+        return sampler(self.np_rng, dist_config, count)
 
     
-    def _initialize_market_makers(self) -> None:
-        config = get_simulation_agent_configuration()
-        group = config.market_maker
-        endowment = config.initial_endowment.market_maker
+    def _register_accounts(self, first_agent_id: int, endowment: FrozenInitialEndowment, count: int) -> List[Tuple[int, AccountView]]:
+        #Registration is the only step touching the environment, agents are built from its views afterwards
         
-        for i in range(group.count):
-            agent_id = 10000 + i
-            
-            init_cash = float(self._sample_value(endowment.cash))
-            init_shares = int(self._sample_value(endowment.shares))
+        cash_column = self._sample_column(endowment.cash, count)
+        shares_column = self._sample_column(endowment.shares, count)
+        
+        accounts = []
+        for i in range(count):
+            agent_id = first_agent_id + i
             
-            account_view = self.register_agent_callback(agent_id, init_cash, init_shares)
+            account_view = self.register_agent_callback(agent_id, float(cash_column[i]), int(shares_column[i]))
             if account_view is None:
                 raise RuntimeError(f"Failed to register agent {agent_id}")
             
-            params = {k: self._sample_value(v) for k, v in group.parameters.items()}
-            
-            agent = MarketMaker(
-                agent_id=agent_id,
-                account_view=account_view,
-                constants=self._get_agent_constants(),
-                target_inventory_fraction=float(params["target_inventory_fraction"]),
-                risk_lower_bound=float(params["risk_lower_bound"]),
-                risk_upper_bound=float(params["risk_upper_bound"]),
-                stabilization_tolerance=float(params["stabilization_tolerance"]),
-                spread_size=int(params["spread_size"]),
-                order_size=int(params["order_size"]),
-                wait_time=int(params["wait_time"]),
-                skew_factor=int(params["skew_factor"])
-            )
-            
-            self.market_makers[agent_id] = agent
-            self.agents[agent_id] = agent
+            accounts.append((agent_id, account_view))
+        
+        return accounts
     
     
-    def _initialize_value_investors(self) -> None:
+    def _initialize_group(self, spec: _AgentGroupSpec) -> None:
         config = get_simulation_agent_configuration()
-        group = config.value_investor
-        endowment = config.initial_endowment.others
+        group = getattr(config, spec.group_key)
+        endowment = getattr(config.initial_endowment, spec.endowment_key)
+        registry = getattr(self, spec.registry)
         
-        for i in range(group.count):
-            agent_id = 20000 + i
-            
-            init_cash = float(self._sample_value(endowment.cash))
-            init_shares = int(self._sample_value(endowment.shares))
-            
-            account_view = self.register_agent_callback(agent_id, init_cash, init_shares)
-            if account_view is None:
-                raise RuntimeError(f"Failed to register agent {agent_id}")
+        accounts = self._register_accounts(spec.first_agent_id, endowment, group.count)
+        param_columns = {k: self._sample_column(v, group.count) for k, v in group.parameters.items()}
+        
+        # Seeded agents keep random.Random, its scalar draws are far cheaper than a Generator's
+        if spec.seeded:
+            agent_seeds = self.np_rng.integers(0, 2**32, size=group.count).tolist()
+        else:
+            agent_seeds = [None] * group.count
+        
+        for i, (agent_id, account_view) in enumerate(accounts):
+            params = {k: column[i] for k, column in param_columns.items()}
             
-            params = {k: self._sample_value(v) for k, v in group.parameters.items()}
+            agent = spec.build(agent_id, account_view, self._agent_constants, params, agent_seeds[i])
             
-            agent = ValueInvestor(
-                agent_id=agent_id,
-                account_view=account_view,
-                constants=self._get_agent_constants(),
-                initial_optimism=float(params["initial_optimism"]),
-                stubbornness=float(params["stubbornness"]),
-                belief_update_rate=float(params["belief_update_rate"]),
-                mispricing_threshold=float(params["mispricing_threshold"]),
-                max_position_fraction=float(params["max_position_fraction"]),
-                deposit_affinity=float(params["deposit_affinity"]),
-                deposit_allocation_fraction=float(params["deposit_allocation_fraction"]),
-                deposit_horizon_preference=float(params["deposit_horizon_preference"]),
-                max_order_size=int(params["max_order_size"]),
-                patience_discount=float(params["patience_discount"]),
-                patience_premium=float(params["patience_premium"])
-            )
+            registry[agent_id] = agent
+            self.agents.append(agent)
+
             
-            self.value_investors[agent_id] = agent
-            self.agents[agent_id] = agent
+    def _build_agent_entries(self) -> None:
+        #Must run again whenever agents are added or removed
+        
+        self._macro_entries = []
+        for agent in self.agents:
+            # MomentumTraders decide through the batch, which shares one signal pass per tick
+            decide = self.momentum_batch.decide if isinstance(agent, MomentumTrader) else agent.decide
+            needs_economy = isinstance(agent, (ValueInvestor, MarketMaker))
+            may_deposit = isinstance(agent, ValueInvestor)
+            self._macro_entries.append((agent.agent_id, agent, decide, agent.update, needs_economy, may_deposit))
+        
+        self._micro_entries = [entry for entry in self._macro_entries if entry[0] not in self.value_investors]
+        self._macro_schedule = list(self._macro_entries)
+        self._micro_schedule = list(self._micro_entries)
     
     
-    def _initialize_momentum_traders(self) -> None:
-        config = get_simulation_agent_configuration()
-        group = config.momentum_trader
-        endowment = config.initial_endowment.others
-        
-        for i in range(group.count):
-            agent_id = 30000 + i
-            
-            init_cash = float(self._sample_value(endowment.cash))
-            init_shares = int(self._sample_value(endowment.shares))
-            
-            account_view = self.register_agent_callback(agent_id, init_cash, init_shares)
-            if account_view is None:
-                raise RuntimeError(f"Failed to register agent {agent_id}")
-            
-            params = {k: self._sample_value(v) for k, v in group.parameters.items()}
-            
-            agent = MomentumTrader(
-                agent_id=agent_id,
-                account_view=account_view,
-                constants=self._get_agent_constants(),
-                momentum_window=int(params["momentum_window"]),
-                entry_threshold=float(params["entry_threshold"]),
-                exit_threshold=float(params["exit_threshold"]),
-                aggressiveness=float(params["aggressiveness"]),
-                max_exposure_fraction=float(params["max_exposure_fraction"]),
-                directional_bias=float(params["directional_bias"]),
-                liquidity_baseline=int(params["liquidity_baseline"])
-            )
-            
-            self.momentum_traders[agent_id] = agent
-            self.agents[agent_id] = agent
+    def macro_tick_agents(self) -> List[AgentEntry]:
+        return self._shuffled(self._macro_entries, self._macro_schedule)
     
     
-    def _initialize_noise_traders(self) -> None:
-        config = get_simulation_agent_configuration()
-        group = config.noise_trader
-        endowment = config.initial_endowment.others
-        
-        for i in range(group.count):
-            agent_id = 40000 + i
-            
-            init_cash = float(self._sample_value(endowment.cash))
-            init_shares = int(self._sample_value(endowment.shares))
-            
-            account_view = self.register_agent_callback(agent_id, init_cash, init_shares)
-            if account_view is None:
-                raise RuntimeError(f"Failed to register agent {agent_id}")
-            
-            params = {k: self._sample_value(v) for k, v in group.parameters.items()}
-            
-            agent_seed = self.rng.randint(0, 2**32 - 1)
-            agent_rng = random.Random(agent_seed)
-            
-            agent = NoiseTrader(
-                agent_id=agent_id,
-                account_view=account_view,
-                constants=self._get_agent_constants(),
-                rng=agent_rng,
-                p_trade=float(params["p_trade"]),
-                p_buy=float(params["p_buy"]),
-                p_market_order=float(params["p_market_order"]),
-                min_quantity=int(params["min_quantity"]),
-                max_quantity=int(params["max_quantity"]),
-                price_offset_ticks=int(params["price_offset_ticks"])
-            )
-            
-            self.noise_traders[agent_id] = agent
-            self.agents[agent_id] = agent
-
-            
-    def macro_tick_agents(self) -> List[Tuple[int, Agent]]:
-        candidates = [(aid, agent) for aid, agent in self.agents.items()]
-        self.rng.shuffle(candidates)
-        return candidates
+    def micro_tick_agents(self) -> List[AgentEntry]:
+        return self._shuffled(self._micro_entries, self._micro_schedule)
     
     
-    def micro_tick_agents(self) -> List[Tuple[int, Agent]]:
-        candidates = []
-        for aid, agent in self.agents.items():
-            if aid not in self.value_investors:
-                candidates.append((aid, agent))
-        
-        self.rng.shuffle(candidates)
-        return candidates
+    def _shuffled(self, entries: List[AgentEntry], schedule: List[AgentEntry]) -> List[AgentEntry]:
+        #Permutation is drawn in NumPy, only the gather runs in Python
+        #Gathers into the same list every tick, it is only valid until the next call
+        order = self.np_rng.permutation(len(entries)).tolist()
+        schedule[:] = map(entries.__getitem__, order)
+        return schedule
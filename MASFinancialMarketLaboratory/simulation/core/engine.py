@@ -1,27 +1,31 @@
 from __future__ import annotations
-from typing import List, Tuple, Optional
+from typing import List, Sequence, Optional
+import itertools
 import time
 
 from environment import Environment
 from environment.views import AccountView
-from agents import Agent, ValueInvestor, MarketMaker
 from agents.models import AgentView, AgentFeedback
 from agents.intents import AgentIntent, PlaceOrderIntent, CancelOrderIntent, CreateDepositIntent
 
-from .agent_manager import AgentManager
+from .agent_manager import AgentManager, AgentEntry
 from simulation.configs import get_simulation_realtime_data
 
 
 
 class SimulationEngine:
+    PROGRESS_INTERVAL: float = 0.1 #Seconds between progress lines
+    
     env: Environment
     agent_manager: AgentManager
+    verbose: bool
     
     
-    def __init__(self, env: Environment):
+    def __init__(self, env: Environment, verbose: bool = False):
         self.env = env
+        self.verbose = verbose
         
-        self.agent_manager = AgentManager(self.__register_agent_callback)
+        self.agent_manager = AgentManager(self.__register_agent_callback, verbose)
         self.agent_manager.initialize_agents()
 
         
@@ -31,12 +35,17 @@ class SimulationEngine:
 
     def run(self) -> None:
         SIM_REALTIME_DATA = get_simulation_realtime_data()
+        last_progress = float("-inf")
         
         while True:
             current_macro = SIM_REALTIME_DATA.MACRO_TICK
             current_micro = SIM_REALTIME_DATA.MICRO_TICK
 
-            print(f"\r\tSimulation running on Macro Tick - {current_macro}, Micro Tick - {current_micro}", end="")
+            if self.verbose:
+                now = time.monotonic()
+                if now - last_progress >= self.PROGRESS_INTERVAL:
+                    last_progress = now
+                    print(f"\r\tSimulation running on Macro Tick - {current_macro}, Micro Tick - {current_micro}", end="", flush=True)
             
             if current_micro == 0:
                 self.env.expire_session()
@@ -70,67 +79,66 @@ class SimulationEngine:
     
     def _agent_loop(
         self, 
-        agents: List[Tuple[int, Agent]], 
+        agents: List[AgentEntry], 
         macro: int, 
         micro: int
     ) -> None:
         sim_data = get_simulation_realtime_data()
         
-        for agent_id, agent in agents:
-            economy_view = None
-            if isinstance(agent, (ValueInvestor, MarketMaker)):
-                economy_view = sim_data.ECONOMY_INSIGHT_VIEW
-
-            view = AgentView(
-                agent_id=agent_id,
-                timestamp=time.time(),
-                macro_tick=macro,
-                micro_tick=micro,
-                market_data_view=sim_data.MARKET_DATA_VIEW,
-                economy_insight_view=economy_view
-            )
+        # Views only change between ticks, so one snapshot (and timestamp) serves every agent
+        market_view = sim_data.MARKET_DATA_VIEW
+        economy_insight_view = sim_data.ECONOMY_INSIGHT_VIEW
+        timestamp = time.time()
+        
+        # Momentum signals only depend on the tick's market snapshot, evaluate them all up front
+        momentum_batch = self.agent_manager.momentum_batch
+        momentum_batch.observe(market_view)
+        
+        # Agents must act in the shuffled order, each one's intents hit the book before the next decides,
+        # so the loop is not split into per-role passes; decide / update are pre-bound per entry instead
+        for agent_id, _, decide, update, needs_economy, may_deposit in agents:
+            # Positional: (agent_id, timestamp, macro_tick, micro_tick, market_data_view, economy_insight_view)
+            view = AgentView(agent_id, timestamp, macro, micro, market_view, economy_insight_view if needs_economy else None)
             
-            intents = agent.decide(view)
+            intents = decide(view)
             if not intents:
                 continue
 
-            if not isinstance(agent, ValueInvestor):
-                assert all(not isinstance(intent, CreateDepositIntent) for intent in intents)
+            assert may_deposit or all(not isinstance(intent, CreateDepositIntent) for intent in intents)
             
             feedback = self._process_intents(agent_id, intents)
-            agent.update(feedback)
+            update(feedback)
     
     
     def _process_intents(
         self, 
         agent_id: int, 
-        intents: List[AgentIntent]
+        intents: Sequence[AgentIntent]
     ) -> AgentFeedback:
-        order_results = {}
-        deposit_results = {}
+        # Keys are laid out once in intent order, the runs below only fill in values
+        order_results = dict.fromkeys([intent.intent_id for intent in intents if not isinstance(intent, CreateDepositIntent)])
+        deposit_results = dict.fromkeys([intent.intent_id for intent in intents if isinstance(intent, CreateDepositIntent)])
         
-        for intent in intents:
-            if isinstance(intent, PlaceOrderIntent):
-                order_view = self.env.create_order(
-                    agent_id=agent_id,
-                    order_type=intent.order_type,
-                    side=intent.side,
-                    quantity=intent.quantity,
-                    price=intent.price
+        # One env call per run of same-type intents, runs keep the agent's intent order
+        for intent_type, run in itertools.groupby(intents, type):
+            run = list(run)
+            
+            if intent_type is PlaceOrderIntent:
+                order_views = self.env.create_orders(
+                    agent_id,
+                    [(intent.order_type, intent.side, intent.quantity, intent.price) for intent in run]
                 )
-                order_results[intent.intent_id] = order_view
+                order_results.update(zip([intent.intent_id for intent in run], order_views))
             
-            elif isinstance(intent, CancelOrderIntent):
-                self.env.cancel_order(agent_id, intent.order_id)
-                order_results[intent.intent_id] = None
+            elif intent_type is CancelOrderIntent:
+                self.env.cancel_orders(agent_id, [intent.order_id for intent in run])
             
-            elif isinstance(intent, CreateDepositIntent):
-                deposit_view = self.env.create_deposit(
-                    agent_id=agent_id,
-                    term=intent.term,
-                    deposited_cash=intent.amount
+            elif intent_type is CreateDepositIntent:
+                deposit_views = self.env.create_deposits(
+                    agent_id,
+                    [(intent.term, intent.amount) for intent in run]
                 )
-                deposit_results[intent.intent_id] = deposit_view
+                deposit_results.update(zip([intent.intent_id for intent in run], deposit_views))
         
         return AgentFeedback(
             agent_id=agent_id,
@@ -9,7 +9,7 @@ from environment.views.market_data_view import MarketDataView
 from simulation.configs import set_simulation_configuration, set_simulation_realtime_data
 from simulation.configs.simulation_configurations import SimulationConfigurations, get_simulation_configurations 
 from simulation.configs.simulation_realtime_data import SimulationRealTimeData
-from simulation.configs.simulation_agent_configuration import SimulationAgentConfiguration, set_simulation_agent_configuration
+from simulation.configs.simulation_agent_configuration import SimulationAgentConfiguration, FrozenSimulationAgentConfiguration, set_simulation_agent_configuration
 
 
 class SimulationInitializer:
@@ -129,7 +129,8 @@ class SimulationInitializer:
         # Pydantic will parse the dictionary and handle nested models
         # alias="global" allows handling the "global" key
         config = SimulationAgentConfiguration(**agent_config)
-        set_simulation_agent_configuration(config)
+        # Validated once, the simulation reads the slotted mirror
+        set_simulation_agent_configuration(FrozenSimulationAgentConfiguration.from_settings(config))
 
 
     @staticmethod
@@ -139,7 +140,10 @@ class SimulationInitializer:
         init_econ_insight_view = EconomyInsightView(
             macro_tick=-1,
             tv_interval=(-1, -1),
-            deposit_rates={-1: -1}
+            deposit_rates={-1: -1},
+            tv_low=-1,
+            tv_width=0,
+            max_deposit_term=-1
         )
         init_market_data_view = MarketDataView(
             timestamp=-1,
@@ -161,7 +165,8 @@ class SimulationInitializer:
             asks_depth_N=-1,
             imbalance_N=None,
             vwap_macro=None,
-            vwap_micro=None
+            vwap_micro=None,
+            estimated_mid=None
         )
         
         set_simulation_realtime_data(